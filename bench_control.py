@@ -0,0 +1,97 @@
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from model_builder import NetworkBuilder
+from train_manager import Trainer
+from data_loader import SyntheticDataLoader
+
+
+def build_trainer(image_size, width, num_batches, batch_size):
+    gen_layers = [
+        {"layer_type": "Dense", "units": width * 4 * 4 * 4, "activation": "relu"},
+        {"layer_type": "unflatten", "height": 4, "width": 4},
+    ]
+    size = 4
+    channels = width * 4
+    while size < image_size:
+        channels = max(width, channels // 2)
+        gen_layers.append({"layer_type": "transposed_conv", "units": channels, "activation": "relu"})
+        size *= 2
+    disc_layers = []
+    size = image_size
+    channels = width
+    while size > 4:
+        disc_layers.append({"layer_type": "Convolution", "units": channels, "kernel_size": 4,
+                            "stride": 2, "padding": 1, "activation": "leakyrelu"})
+        channels *= 2
+        size //= 2
+    disc_layers.append({"layer_type": "flatten"})
+    generator = NetworkBuilder(100, gen_layers, 3).build_network()
+    discriminator = NetworkBuilder((image_size, image_size), disc_layers, 1).build_network()
+    params = {"loss_function": "BCEWithLogitsLoss"}
+    return Trainer(generator, discriminator, params, dict(params),
+                   data_loader=SyntheticDataLoader(batch_size, image_size, num_batches))
+
+
+def measure(trainer, commands, min_delay, max_delay):
+    """
+    Envoie des cycles pause/reprise puis un arrêt ; retourne les latences (s)
+    mesurées par le Trainer lui-même et les durées de pas. L'attente ne scrute
+    que toutes les 10 ms pour ne pas disputer le GIL à la boucle d'entraînement.
+    """
+    step_times = []
+    last = [None]
+
+    def on_event(event):
+        if event["type"] == "step":
+            now = time.perf_counter()
+            if last[0] is not None:
+                step_times.append(now - last[0])
+            last[0] = now
+
+    trainer.add_listener(on_event)
+    thread = threading.Thread(target=trainer.train_discriminator, args=(10 ** 6, trainer.data_loader.batch_size))
+    thread.start()
+    # Les premiers pas (initialisation des noyaux) ne sont pas représentatifs
+    while len(step_times) < 2:
+        time.sleep(0.01)
+    trainer.control_latencies.clear()
+    for _ in range(commands):
+        time.sleep(random.uniform(min_delay, max_delay))
+        trainer.pause()
+        while trainer.paused_at is None:
+            time.sleep(0.01)
+        last[0] = None
+        trainer.resume()
+    pause_latencies = list(trainer.control_latencies)
+    time.sleep(random.uniform(min_delay, max_delay))
+    trainer.stop()
+    thread.join()
+    stop_latency = trainer.control_latencies[-1]
+    return pause_latencies, stop_latency, step_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence des commandes pause/arrêt sous charge")
+    parser.add_argument("--image-size", type=int, default=64)
+    parser.add_argument("--width", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--commands", type=int, default=20)
+    parser.add_argument("--min-delay", type=float, default=0.2)
+    parser.add_argument("--max-delay", type=float, default=1.0)
+    args = parser.parse_args()
+
+    trainer = build_trainer(args.image_size, args.width, 8, args.batch_size)
+    pauses, stop_latency, steps = measure(trainer, args.commands, args.min_delay, args.max_delay)
+    pauses.sort()
+    print(f"Pas d'entraînement : moyenne {statistics.fmean(steps) * 1000:.1f} ms - max {max(steps) * 1000:.1f} ms")
+    print(f"Latence pause : p50 {statistics.median(pauses) * 1000:.1f} ms - "
+          f"p99 {pauses[min(len(pauses) - 1, int(0.99 * len(pauses)))] * 1000:.1f} ms - max {pauses[-1] * 1000:.1f} ms")
+    print(f"Latence arrêt : {stop_latency * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Chaque cible est exécutée dans un interpréteur neuf ; le script imprime le
+# temps écoulé (secondes) mesuré à l'intérieur du processus.
+TARGETS = {
+    "main": "import main",
+    "main_window": (
+        "import tkinter as tk\n"
+        "import main\n"
+        "root = tk.Tk()\n"
+        "app = main.GanConfigurator(root)\n"
+        "root.update()\n"
+    ),
+    "controller": "import controller",
+    "headless": "import headless",
+    "headless_help": (
+        "import headless\n"
+        "try:\n"
+        "    headless.main(['--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+    ),
+    "serving": "import serving",
+}
+
+TEMPLATE = (
+    "import time, sys, io\n"
+    "_start = time.perf_counter()\n"
+    "_stdout, sys.stdout = sys.stdout, io.StringIO()\n"
+    "{code}\n"
+    "sys.stdout = _stdout\n"
+    "print(time.perf_counter() - _start)\n"
+)
+
+
+def measure(target, repeat=5):
+    """Temps d'import médian/minimal (ms) d'une cible, None si elle échoue (ex. pas d'affichage)."""
+    samples = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", TEMPLATE.format(code=TARGETS[target])],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return None
+        samples.append(float(result.stdout.strip().splitlines()[-1]) * 1000)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du temps de démarrage (imports)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--targets", nargs="*", default=list(TARGETS))
+    parser.add_argument("--json", default=None, help="Fichier où écrire les résultats")
+    args = parser.parse_args()
+
+    results = {}
+    for target in args.targets:
+        results[target] = measure(target, args.repeat)
+        if results[target] is None:
+            print(f"{target:<15} indisponible")
+        else:
+            print(f"{target:<15} médiane {results[target]['median_ms']:8.1f} ms - min {results[target]['min_ms']:8.1f} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlparse
+
+from serving import UnixHTTPConnection
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_load(url=None, unix_socket=None, clients=16, requests_per_client=50, samples=1, fmt="png"):
+    """
+    Lance `clients` threads qui envoient chacun `requests_per_client` requêtes
+    et retourne latences p50/p99 (ms) et débit (requêtes/s, échantillons/s).
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    path = f"/sample?n={samples}&format={fmt}"
+
+    def connect():
+        if unix_socket:
+            return UnixHTTPConnection(unix_socket)
+        parsed = urlparse(url)
+        return http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+
+    def client():
+        conn = connect()
+        local = []
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    raise RuntimeError(f"HTTP {response.status}")
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                conn.close()
+                conn = connect()
+                continue
+            local.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if not latencies:
+        raise RuntimeError(f"Aucune requête n'a abouti ({len(errors)} erreurs)")
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "requests_per_s": len(latencies) / elapsed,
+        "samples_per_s": len(latencies) * samples / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de charge du service d'échantillons")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--socket", default=None)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="Requêtes par client")
+    parser.add_argument("--samples", type=int, default=1, help="Échantillons par requête")
+    parser.add_argument("--format", default="png", choices=["png", "raw"])
+    args = parser.parse_args()
+
+    result = run_load(args.url, args.socket, args.clients, args.requests, args.samples, args.format)
+    print(f"Requêtes : {result['requests']} ({result['errors']} erreurs)")
+    print(f"Latence p50 : {result['p50_ms']:.1f} ms - p99 : {result['p99_ms']:.1f} ms")
+    print(f"Débit : {result['requests_per_s']:.1f} req/s - {result['samples_per_s']:.1f} échantillons/s")
+
+
+if __name__ == "__main__":
+    main()
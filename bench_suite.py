@@ -0,0 +1,313 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(ROOT, "bench_baseline.json")
+
+# Sens d'amélioration de chaque métrique : les durées et la mémoire doivent
+# baisser, les débits augmenter.
+METRICS = {
+    "build_ms": "lower",
+    "d_step_ms": "lower",
+    "g_step_ms": "lower",
+    "samples_per_s": "higher",
+    "peak_mb": "lower",
+    "loader_images_per_s": "higher",
+}
+
+
+def dcgan_configs(image_size, width=32, latent_size=100):
+    """Générateur et discriminateur DCGAN au format gen_config / disc_config."""
+    gen_layers = [
+        {"layer_type": "Dense", "units": width * 8 * 4 * 4, "activation": "relu"},
+        {"layer_type": "unflatten", "height": 4, "width": 4},
+    ]
+    size, channels = 4, width * 8
+    while size < image_size:
+        channels = max(width, channels // 2)
+        gen_layers.append({"layer_type": "transposed_conv", "units": channels, "activation": "relu"})
+        size *= 2
+    disc_layers = []
+    size, channels = image_size, width
+    while size > 4:
+        disc_layers.append({"layer_type": "Convolution", "units": channels, "kernel_size": 4,
+                            "stride": 2, "padding": 1, "activation": "leakyrelu"})
+        channels = min(channels * 2, width * 8)
+        size //= 2
+    disc_layers.append({"layer_type": "flatten"})
+    return (
+        {"input_size": latent_size, "layers": gen_layers, "output_size": 3},
+        {"input_size": [image_size, image_size], "layers": disc_layers, "output_size": 1},
+    )
+
+
+def mlp_configs(image_size, hidden=512, latent_size=100):
+    """GAN entièrement dense : l'image n'est dépliée qu'en sortie du générateur."""
+    features = 3 * image_size * image_size
+    gen_layers = [
+        {"layer_type": "Dense", "units": hidden // 2, "activation": "relu"},
+        {"layer_type": "Dense", "units": hidden, "activation": "relu"},
+        {"layer_type": "Dense", "units": features, "activation": "tanh"},
+        {"layer_type": "unflatten", "height": image_size, "width": image_size},
+    ]
+    disc_layers = [
+        {"layer_type": "flatten"},
+        {"layer_type": "Dense", "units": hidden, "activation": "leakyrelu"},
+        {"layer_type": "Dense", "units": hidden // 2, "activation": "leakyrelu"},
+    ]
+    return (
+        {"input_size": latent_size, "layers": gen_layers, "output_size": 3},
+        {"input_size": [image_size, image_size], "layers": disc_layers, "output_size": 1},
+    )
+
+
+def deep_generator_configs(image_size, depth=8, width=32, latent_size=100):
+    """DCGAN dont le générateur empile `depth` convolutions transposées supplémentaires à résolution fixe."""
+    gen_config, disc_config = dcgan_configs(image_size, width, latent_size)
+    gen_config["layers"] += [
+        {"layer_type": "transposed_conv", "units": width, "kernel_size": 3, "stride": 1, "padding": 1,
+         "activation": "relu"}
+        for _ in range(depth)
+    ]
+    return gen_config, disc_config
+
+
+# Configurations de référence : (gen_config, disc_config, taille d'image)
+CONFIGS = {
+    "mlp_32": lambda: (*mlp_configs(32), 32),
+    "dcgan_32": lambda: (*dcgan_configs(32), 32),
+    "dcgan_64": lambda: (*dcgan_configs(64), 64),
+    "dcgan_128": lambda: (*dcgan_configs(128), 128),
+    "deep_tconv_64": lambda: (*deep_generator_configs(64), 64),
+}
+
+
+def make_image_folder(root, image_size, count):
+    """Dossier ImageFolder synthétique (une classe, PNG de bruit) pour mesurer le DataLoader."""
+    import torch
+    from image_utils import encode_png
+
+    folder = os.path.join(root, f"synthetic_{image_size}")
+    class_dir = os.path.join(folder, "bruit")
+    os.makedirs(class_dir, exist_ok=True)
+    generator = torch.Generator().manual_seed(image_size)
+    for index in range(count):
+        image = torch.randint(0, 256, (3, image_size, image_size), dtype=torch.uint8, generator=generator)
+        with open(os.path.join(class_dir, f"{index:05d}.png"), "wb") as f:
+            f.write(encode_png(image, compression_level=1))
+    return folder
+
+
+def _timed(fn, repeat, warmup):
+    """Durées (ms) de `repeat` appels après `warmup` appels d'échauffement."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run_config(name, steps=10, warmup=2, batch_size=32, data_root=None):
+    """Mesure une configuration de référence ; à exécuter dans un processus neuf (pic mémoire)."""
+    import resource
+    import torch
+    from model_builder import NetworkBuilder, get_latent_size
+    from train_manager import Trainer
+    from data_loader import DataLoader
+
+    gen_config, disc_config, image_size = CONFIGS[name]()
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    torch.manual_seed(0)
+
+    def build():
+        return (NetworkBuilder.from_config(gen_config, 100, 3).build_network(),
+                NetworkBuilder.from_config(disc_config, 64, 1).build_network())
+
+    build_ms = statistics.median(_timed(build, 5, 1))
+    generator, discriminator = build()
+    params = {"loss_function": "BCEWithLogitsLoss"}
+    trainer = Trainer(generator, discriminator, params, dict(params), device=device)
+    latent_size = get_latent_size(generator)
+    real = torch.randn(batch_size, 3, image_size, image_size, device=device)
+
+    def sync():
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+
+    # Mêmes étapes que les boucles du Trainer
+    def d_step():
+        noise = torch.randn(batch_size, latent_size, device=device)
+        fake = generator(noise).detach()
+        trainer._freeze(generator, True)
+        trainer._freeze(discriminator, False)
+        trainer._train_discriminator(real, fake)
+        sync()
+
+    def g_step():
+        noise = torch.randn(batch_size, latent_size, device=device)
+        trainer._freeze(discriminator, True)
+        trainer._freeze(generator, False)
+        trainer._train_generator(noise)
+        sync()
+
+    d_step_ms = statistics.median(_timed(d_step, steps, warmup))
+    g_step_ms = statistics.median(_timed(g_step, steps, warmup))
+
+    sample_batch = batch_size * 4
+    noise = torch.randn(sample_batch, latent_size, device=device)
+    generator.eval()
+
+    def sample():
+        with torch.inference_mode():
+            generator(noise)
+        sync()
+
+    sample_ms = statistics.median(_timed(sample, steps, warmup))
+    generator.train()
+
+    # ru_maxrss est en octets sous macOS, en Kio sous Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+    if device.type == "cuda":
+        peak_mb = torch.cuda.max_memory_allocated() / (1024 * 1024)
+
+    # Débit du DataLoader du projet (décodage + transformations + workers)
+    loader_images_per_s = None
+    if data_root:
+        folder = os.path.join(data_root, f"synthetic_{image_size}")
+        loader = DataLoader(folder, batch_size=batch_size, image_size=image_size).get_data_loader()
+        start = time.perf_counter()
+        count = sum(batch[0].size(0) for batch in loader)
+        loader_images_per_s = count / (time.perf_counter() - start)
+
+    return {
+        "build_ms": build_ms,
+        "d_step_ms": d_step_ms,
+        "g_step_ms": g_step_ms,
+        "samples_per_s": sample_batch / (sample_ms / 1000),
+        "peak_mb": peak_mb,
+        "loader_images_per_s": loader_images_per_s,
+    }
+
+
+def environment():
+    import torch
+    return {
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+        "device": torch.cuda.get_device_name(0) if torch.cuda.is_available() else "cpu",
+    }
+
+
+def run_suite(names, steps=10, warmup=2, batch_size=32, loader_images=256):
+    """Exécute chaque configuration dans un interpréteur neuf et retourne les résultats."""
+    results = {}
+    with tempfile.TemporaryDirectory() as data_root:
+        for image_size in sorted({CONFIGS[name]()[2] for name in names}):
+            make_image_folder(data_root, image_size, loader_images)
+        for name in names:
+            code = (
+                "import json, bench_suite\n"
+                f"print(json.dumps(bench_suite.run_config({name!r}, {steps}, {warmup}, {batch_size}, "
+                f"{data_root!r})))\n"
+            )
+            result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(f"Échec de la configuration {name} :\n{result.stderr}")
+            results[name] = json.loads(result.stdout.strip().splitlines()[-1])
+    return {"environment": environment(), "results": results}
+
+
+def compare(current, baseline, threshold):
+    """
+    Liste des régressions (config, métrique, référence, mesure, écart relatif)
+    au-delà du seuil relatif `threshold`.
+    """
+    regressions = []
+    for name, metrics in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            continue
+        for metric, direction in METRICS.items():
+            old, new = reference.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old if direction == "lower" else (old - new) / old
+            if change > threshold:
+                regressions.append((name, metric, old, new, change))
+    return regressions
+
+
+def format_results(report):
+    header = f"{'configuration':<15}" + "".join(f"{metric:>21}" for metric in METRICS)
+    lines = [header, "-" * len(header)]
+    for name, metrics in report["results"].items():
+        cells = "".join(
+            f"{metrics[metric]:>21.1f}" if metrics.get(metric) is not None else f"{'-':>21}"
+            for metric in METRICS
+        )
+        lines.append(f"{name:<15}{cells}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suite de benchmarks sur des configurations GAN de référence")
+    parser.add_argument("--configs", nargs="*", default=list(CONFIGS), choices=list(CONFIGS))
+    parser.add_argument("--steps", type=int, default=10, help="Pas mesurés par réseau")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--loader-images", type=int, default=256, help="Images synthétiques pour le DataLoader")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Fichier JSON de référence")
+    parser.add_argument("--save-baseline", action="store_true", help="Enregistre les mesures comme référence")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Régression relative tolérée (0.15 = 15 %%)")
+    parser.add_argument("--json", default=None, help="Fichier où écrire les résultats")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.configs, args.steps, args.warmup, args.batch_size, args.loader_images)
+    print(format_results(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {"environment": report["environment"], "results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline["results"] = json.load(f)["results"]
+        baseline["results"].update(report["results"])
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Référence enregistrée dans {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Aucune référence ({args.baseline}) : relancez avec --save-baseline.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("environment") != report["environment"]:
+        print("Attention : la référence a été mesurée dans un autre environnement.")
+    regressions = compare(report, baseline, args.threshold)
+    for name, metric, old, new, change in regressions:
+        print(f"RÉGRESSION {name} {metric} : {old:.1f} -> {new:.1f} ({change:+.0%})")
+    if regressions:
+        return 1
+    print(f"Aucune régression au-delà de {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
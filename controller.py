@@ -1,9 +1,14 @@
 # controller.py
+import os
 import threading
 import torch
 from model_builder import NetworkBuilder
 from train_manager import Trainer
-from data_loader import DataLoader
+from data_loader import DataLoader, SyntheticDataLoader
+from evaluation import build_evaluator
+from preview import SamplePreviewer
+from replay_buffer import ReplayBuffer
+from placement import detect_topology, plan_placement, apply_compute_placement
 
 class GANController:
     def __init__(self, gen_config, disc_config, training_config):
@@ -25,7 +30,15 @@ class GANController:
                 "epochs": 10,
                 "batch_size": 32,
                 "data_folder": "chemin/vers/donnees",
-                "initial_network": "generator"
+                "initial_network": "generator",
+                "evaluation": {"interval": 5, "num_samples": 1000},  # optionnel (FID)
+                "profiling": False,  # chronométrage par couche
+                "memory": {"limit_mb": 8000, "log": "run_memory.jsonl"},  # optionnel
+                "preview": {"interval": 5.0, "num_samples": 16},  # aperçu périodique
+                "synthetic": {"num_batches": 100, "seed": 0, "images_per_second": None},  # sans dossier
+                "progressive": {"start_size": 8, "epochs_per_stage": 2, "fade_epochs": 1},  # résolution croissante
+                "replay": {"capacity": 4096, "mix": 0.5, "dtype": "float16"},  # faux rejoués (discriminateur)
+                "placement": {"data_workers": 2, "worker_cores": None}  # cœurs / nœuds NUMA séparés (sans effet en synthétique)
             }
         """
         self.gen_config = gen_config
@@ -40,12 +53,39 @@ class GANController:
         self.generator = self.build_generator()
         self.discriminator = self.build_discriminator()
 
-        # Initialisation du DataLoader
-        self.data_loader = DataLoader(
-            data_folder=training_config.get("data_folder", ""),
-            batch_size=training_config.get("batch_size", 32),
-            image_size=64  # Taille des images (à ajuster selon vos besoins)
-        )
+        # Initialisation du DataLoader (dossier d'images, ou données synthétiques générées sur le device)
+        synthetic_config = training_config.get("synthetic")
+        if synthetic_config:
+            self.data_loader = SyntheticDataLoader(
+                batch_size=training_config.get("batch_size", 32),
+                image_size=synthetic_config.get("image_size", 64),
+                num_batches=synthetic_config.get("num_batches", 100),
+                seed=synthetic_config.get("seed", 0),
+                device=self.device,
+                images_per_second=synthetic_config.get("images_per_second")
+            )
+        else:
+            self.data_loader = DataLoader(
+                data_folder=training_config.get("data_folder", ""),
+                batch_size=training_config.get("batch_size", 32),
+                image_size=64  # Taille des images (à ajuster selon vos besoins)
+            )
+
+        # Placement : workers de données et threads de calcul sur des cœurs (et nœuds NUMA) distincts.
+        # Les données synthétiques sont générées dans le processus, sans workers : rien à placer.
+        self.placement = None
+        self.placement_note = None
+        placement_config = training_config.get("placement")
+        if placement_config and isinstance(self.data_loader, SyntheticDataLoader):
+            self.placement_note = "Placement ignoré : les données synthétiques n'utilisent pas de workers."
+        elif placement_config:
+            data_workers = placement_config.get("data_workers", 2)
+            self.data_loader.num_workers = data_workers
+            if placement_config.get("enabled", True):
+                self.placement = plan_placement(detect_topology(), data_workers, placement_config.get("worker_cores"))
+            if self.placement is not None:
+                # Seuls les workers sont épinglés ici ; le processus l'est par apply_placement
+                self.data_loader.worker_init_fn = self.placement.worker_init_fn()
 
         # Initialisation du Trainer avec les deux jeux de paramètres
         self.trainer = Trainer(
@@ -57,26 +97,72 @@ class GANController:
             data_loader=self.data_loader
         )
 
+        # Évaluation périodique de la qualité (distance de Fréchet)
+        eval_config = training_config.get("evaluation")
+        if eval_config:
+            evaluator = build_evaluator(eval_config, self.discriminator, self.device)
+            self.trainer.set_evaluator(evaluator, eval_config)
+
+        if training_config.get("profiling"):
+            self.trainer.enable_profiling()
+
+        # Suivi mémoire par phase, avec plafond optionnel
+        memory_config = training_config.get("memory")
+        if memory_config:
+            self.trainer.enable_memory_tracking(
+                limit_mb=memory_config.get("limit_mb"),
+                log_path=memory_config.get("log"),
+                sample_interval=memory_config.get("sample_interval", 0.05)
+            )
+
+        # Aperçu périodique sur un lot de bruit fixe
+        self.previewer = None
+        preview_config = training_config.get("preview")
+        if preview_config:
+            self.previewer = SamplePreviewer(
+                self.generator,
+                self.device,
+                num_samples=preview_config.get("num_samples", 16),
+                interval=preview_config.get("interval", 5.0),
+                nrow=preview_config.get("nrow", 4),
+                thumb_size=preview_config.get("thumb_size", 64)
+            )
+            self.trainer.previewer = self.previewer
+
+        # Faux rejoués : moins de passages du générateur pendant les phases du discriminateur
+        replay_config = training_config.get("replay")
+        if replay_config:
+            self.trainer.replay = ReplayBuffer(
+                capacity=replay_config.get("capacity", 4096),
+                mix=replay_config.get("mix", 0.5),
+                dtype=replay_config.get("dtype", "float16"),
+                device=self.device
+            )
+
         self.update_learning_rates()
         self.trainer.current_network = training_config.get("initial_network", "générateur")
         self.training_thread_gen = None
         self.training_thread_disc = None
+        self._callback = None
+        self._switched = False
+        # Avancement dans la liste de phases (run_phases), pour la reprise après préemption
+        self.progress = {"phase": 0, "epoch": 0}
+
+    def apply_placement(self, num_threads=None):
+        """
+        Épingle le processus sur les cœurs de calcul du placement. L'affinité
+        et torch.set_num_threads valent pour tout le processus : à n'appeler
+        que depuis un processus dédié à l'entraînement (headless, tâche du
+        scheduler), jamais depuis l'interface ou la file partagée.
+        """
+        if self.placement is not None:
+            apply_compute_placement(self.placement, num_threads)
 
     def build_generator(self):
-        input_size = self.gen_config.get("input_size", 100)
-        layers = self.gen_config.get("layers", [])
-        output_size = self.gen_config.get("output_size", 64)
-        global_activation = self.gen_config.get("global_activation", "relu")
-        builder = NetworkBuilder(input_size, layers, output_size, global_activation)
-        return builder.build_network()
+        return NetworkBuilder.from_config(self.gen_config, 100, 64).build_network()
 
     def build_discriminator(self):
-        input_size = self.disc_config.get("input_size", 64)
-        layers = self.disc_config.get("layers", [])
-        output_size = self.disc_config.get("output_size", 1)
-        global_activation = self.disc_config.get("global_activation", "relu")
-        builder = NetworkBuilder(input_size, layers, output_size, global_activation)
-        return builder.build_network()
+        return NetworkBuilder.from_config(self.disc_config, 64, 1).build_network()
 
     def update_learning_rates(self):
         gen_lr = self.gen_train_params.get("learning_rate", 0.001)
@@ -87,53 +173,150 @@ class GANController:
         for param_group in self.trainer.disc_optimizer.param_groups:
             param_group['lr'] = disc_lr
 
-    def start_training(self, callback):
+    def _check_data(self):
+        if isinstance(self.data_loader, SyntheticDataLoader):
+            return
         # Vérifier que le dossier de données est valide
         if not self.training_config.get("data_folder"):
-            messagebox.showerror("Erreur", "Aucun dossier de données sélectionné.")
-            return
-        # Récupérer le DataLoader depuis le Trainer
-        data_loader = self.data_loader.get_data_loader()
+            raise ValueError("Aucun dossier de données sélectionné.")
         # Vérifier que le DataLoader a bien chargé des données
-        if data_loader is None:
-            messagebox.showerror("Erreur", "Impossible de charger les données. Vérifiez le dossier sélectionné.")
-            return
-        # Récupération des paramètres d'entraînement
-        gen_epochs = self.gen_train_params.get("epochs", 10)
-        disc_epochs = self.disc_train_params.get("epochs", 10)
-        gen_batch_size = self.gen_train_params.get("batch_size", 32)
-        disc_batch_size = self.disc_train_params.get("batch_size", 32)
-        # Passage des paramètres au trainer
+        if self.data_loader.get_data_loader() is None:
+            raise ValueError("Impossible de charger les données. Vérifiez le dossier sélectionné.")
+
+    def _training_job(self, callback):
+        """Fonction d'entraînement du réseau courant et ses arguments."""
+        progressive_config = self.training_config.get("progressive")
+        if progressive_config:
+            # Les deux réseaux sont entraînés ensemble, résolution par résolution
+            return self.trainer.train_progressive, (
+                progressive_config.get("start_size", 8),
+                progressive_config.get("epochs_per_stage", 2),
+                progressive_config.get("fade_epochs", 1),
+                callback
+            )
         if self.trainer.current_network == "générateur":
-            self.training_thread_gen = threading.Thread(
-                target=self.trainer.train_generator,
-                args=(
-                    gen_epochs,
-                    gen_batch_size,
-                    callback
-                )
+            return self.trainer.train_generator, (
+                self.gen_train_params.get("epochs", 10),
+                self.gen_train_params.get("batch_size", 32),
+                callback
             )
-            self.training_thread_gen.start()
+        return self.trainer.train_discriminator, (
+            self.disc_train_params.get("epochs", 10),
+            self.disc_train_params.get("batch_size", 32),
+            callback
+        )
+
+    def start_training(self, callback):
+        self._callback = callback
+        self._check_data()
+        target, args = self._training_job(callback)
+        thread = threading.Thread(target=target, args=args)
+        if self.trainer.current_network == "générateur":
+            self.training_thread_gen = thread
         else:
-            self.training_thread_disc = threading.Thread(
-                target=self.trainer.train_discriminator,
-                args=(
-                    disc_epochs,
-                    disc_batch_size,
-                    callback
-                )
-            )
-            self.training_thread_disc.start()
-        
+            self.training_thread_disc = thread
+        thread.start()
+
+    def run_training(self, callback=None, start_epoch=1):
+        """Entraîne le réseau courant jusqu'au bout dans le thread appelant (mode sans interface)."""
+        self._check_data()
+        target, args = self._training_job(callback)
+        target(*args, start_epoch=start_epoch)
+
+    def training_phases(self, phases):
+        """En mode progressif, les deux réseaux s'entraînent ensemble : une seule phase."""
+        return list(phases[:1]) if self.training_config.get("progressive") else list(phases)
+
+    def run_phases(self, phases, callback=None):
+        """
+        Entraîne les phases dans l'ordre en reprenant à self.progress.
+        Retourne False si l'entraînement a été préempté (voir save_checkpoint).
+        """
+        phases = self.training_phases(phases)
+        while self.progress["phase"] < len(phases):
+            self.trainer.current_network = phases[self.progress["phase"]]
+            self.run_training(callback, start_epoch=self.progress["epoch"] + 1)
+            if self.trainer.preempted:
+                self.progress["epoch"] = self.trainer.completed_epochs
+                return False
+            self.progress = {"phase": self.progress["phase"] + 1, "epoch": 0}
+        return True
+
+    def _weights_paths(self, path):
+        root, ext = os.path.splitext(path)
+        return f"{root}_generateur{ext}", f"{root}_discriminateur{ext}"
+
+    def save_model(self, path):
+        """
+        Sauvegarde les poids des deux réseaux à côté de `path` (suffixes
+        _generateur / _discriminateur). Avec l'extension .flat, le format plat
+        projeté en mémoire est utilisé.
+        """
+        self.trainer.save_model(*self._weights_paths(path))
+
+    def load_model(self, path):
+        self.trainer.load_model(*self._weights_paths(path))
+
+    def save_checkpoint(self, path):
+        """Sauvegarde configurations, poids, optimiseurs et progression (écriture atomique)."""
+        state = {
+            "gen_config": self.gen_config,
+            "disc_config": self.disc_config,
+            "training_config": self.training_config,
+            "progress": self.progress,
+            "trainer": self.trainer.checkpoint_state()
+        }
+        tmp_path = path + ".tmp"
+        torch.save(state, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def from_checkpoint(cls, path):
+        state = torch.load(path, map_location="cpu", weights_only=False)
+        controller = cls(state["gen_config"], state["disc_config"], state["training_config"])
+        controller.trainer.load_checkpoint_state(state["trainer"])
+        controller.progress = state["progress"]
+        return controller
+
+    def add_listener(self, listener):
+        """listener(event: dict) reçoit les événements structurés de l'entraînement."""
+        self.trainer.add_listener(listener)
 
     def pause_training(self):
         self.trainer.pause()
 
+    def _ensure_current_loop(self):
+        """
+        Démarre la boucle du réseau courant si elle n'existe pas encore. L'autre
+        boucle reste suspendue à son point de pause et reprendra au même pas.
+        """
+        if self._callback is None or not self._switched:
+            return
+        is_gen = self.trainer.current_network == "générateur"
+        thread = self.training_thread_gen if is_gen else self.training_thread_disc
+        event = self.trainer.pause_event_gen if is_gen else self.trainer.pause_event_disc
+        if not event.is_set():
+            return
+        self._switched = False
+        if thread is None or not thread.is_alive():
+            self.start_training(self._callback)
+
     def resume_training(self):
         self.trainer.resume()
+        self._ensure_current_loop()
+
+    def can_switch(self):
+        """En mode progressif, une seule boucle entraîne les deux réseaux : rien à switcher."""
+        return not self.training_config.get("progressive")
 
     def switch_network(self):
+        """Retourne False (sans effet) si le switch n'a pas de sens, voir can_switch."""
+        if not self.can_switch():
+            return False
         self.trainer.switch()
+        self._switched = True
+        self._ensure_current_loop()
+        return True
 
     def stop_training(self):
         self.trainer.stop()
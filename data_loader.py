@@ -1,16 +1,21 @@
 # data_loader.py
-import os
+import time
 import torch
-from torchvision import datasets, transforms
 from torch.utils.data import DataLoader as dt
 
 class DataLoader:
-    def __init__(self, data_folder, batch_size=32, image_size=64):
+    def __init__(self, data_folder, batch_size=32, image_size=64, num_workers=2, worker_init_fn=None):
         self.data_folder = data_folder
         self.batch_size = batch_size
         self.image_size = image_size
+        self.num_workers = num_workers
+        # Appelé dans chaque worker au démarrage (placement sur des cœurs dédiés)
+        self.worker_init_fn = worker_init_fn
 
     def get_data_loader(self):
+        # torchvision n'est chargé qu'au premier accès aux données
+        from torchvision import datasets, transforms
+
         transform = transforms.Compose([
             transforms.Resize(self.image_size),
             transforms.CenterCrop(self.image_size),
@@ -19,5 +24,56 @@ class DataLoader:
         ])
 
         dataset = datasets.ImageFolder(root=self.data_folder, transform=transform)
-        data_loader = dt(dataset, batch_size=self.batch_size, shuffle=True, num_workers=2)
+        data_loader = dt(dataset, batch_size=self.batch_size, shuffle=True,
+                         num_workers=self.num_workers, worker_init_fn=self.worker_init_fn)
         return data_loader
+
+
+class SyntheticDataLoader:
+    def __init__(self, batch_size=32, image_size=64, num_batches=100, seed=0, device=None,
+                 images_per_second=None, channels=3):
+        """
+        Source de données synthétique, sans dossier ni E/S : les batchs sont
+        générés directement sur le device, de façon déterministe à partir de
+        la graine (même graine = mêmes images, epoch après epoch).
+
+        num_batches: nombre de batchs par epoch
+        images_per_second: débit maximal simulé (None = aussi vite que possible)
+        """
+        self.batch_size = batch_size
+        self.image_size = image_size
+        self.num_batches = num_batches
+        self.seed = seed
+        self.device = device if device else torch.device("cpu")
+        self.images_per_second = images_per_second
+        self.channels = channels
+        # Clé du jeu de données (cache des statistiques FID)
+        self.data_folder = f"synthetic://seed={seed}/batches={num_batches}/size={image_size}"
+
+    def get_data_loader(self):
+        return _SyntheticBatches(self)
+
+
+class _SyntheticBatches:
+    """Itérable réutilisable : chaque itération rejoue la même séquence de batchs."""
+    def __init__(self, source):
+        self.source = source
+        self.batch_size = source.batch_size
+
+    def __len__(self):
+        return self.source.num_batches
+
+    def __iter__(self):
+        source = self.source
+        generator = torch.Generator(device=source.device).manual_seed(source.seed)
+        shape = (source.batch_size, source.channels, source.image_size, source.image_size)
+        labels = torch.zeros(source.batch_size, dtype=torch.long, device=source.device)
+        start = time.perf_counter()
+        for index in range(source.num_batches):
+            if source.images_per_second:
+                delay = start + index * source.batch_size / source.images_per_second - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            # Images normalisées dans [-1, 1], comme celles du DataLoader
+            images = torch.rand(shape, generator=generator, device=source.device).mul_(2).sub_(1)
+            yield images, labels
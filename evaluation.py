@@ -0,0 +1,237 @@
+import copy
+import os
+import hashlib
+import torch
+from model_builder import get_latent_size
+
+
+class RunningStatistics:
+    def __init__(self):
+        """
+        Accumule la moyenne et la covariance de vecteurs de caractéristiques
+        en float64, batch par batch, sans conserver les caractéristiques en mémoire.
+        """
+        self.count = 0
+        self.mean = None
+        self.m2 = None  # somme des produits centrés (co-moment)
+
+    def update(self, features):
+        features = features.detach().reshape(features.size(0), -1).to(torch.float64)
+        n = features.size(0)
+        if n == 0:
+            return
+        batch_mean = features.mean(dim=0)
+        centered = features - batch_mean
+        batch_m2 = centered.T @ centered
+
+        if self.count == 0:
+            self.mean = batch_mean
+            self.m2 = batch_m2
+            self.count = n
+            return
+
+        # Fusion de Chan et al. : combinaison exacte de deux ensembles de moments
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + batch_m2 + torch.outer(delta, delta) * (self.count * n / total)
+        self.count = total
+
+    def covariance(self):
+        if self.count < 2:
+            raise ValueError("Au moins deux échantillons sont nécessaires pour estimer la covariance.")
+        return self.m2 / (self.count - 1)
+
+    def state_dict(self):
+        return {"count": self.count, "mean": self.mean.cpu(), "m2": self.m2.cpu()}
+
+    @classmethod
+    def from_state_dict(cls, state):
+        stats = cls()
+        stats.count = state["count"]
+        stats.mean = state["mean"]
+        stats.m2 = state["m2"]
+        return stats
+
+
+def frechet_distance(mu1, sigma1, mu2, sigma2):
+    """
+    Distance de Fréchet entre deux gaussiennes :
+        ||mu1 - mu2||² + Tr(sigma1 + sigma2 - 2 (sigma1 sigma2)^½)
+    La trace de la racine est obtenue via les valeurs propres de
+    sigma1^½ sigma2 sigma1^½ (symétrique positive), sans scipy.
+    """
+    mu1, mu2 = mu1.to(torch.float64).cpu(), mu2.to(torch.float64).cpu()
+    sigma1, sigma2 = sigma1.to(torch.float64).cpu(), sigma2.to(torch.float64).cpu()
+
+    eigvals, eigvecs = torch.linalg.eigh(sigma1)
+    sqrt_sigma1 = (eigvecs * eigvals.clamp(min=0).sqrt()) @ eigvecs.T
+    product = sqrt_sigma1 @ sigma2 @ sqrt_sigma1
+    product = (product + product.T) / 2
+    trace_sqrt = torch.linalg.eigvalsh(product).clamp(min=0).sqrt().sum()
+
+    diff = mu1 - mu2
+    return (diff @ diff + torch.trace(sigma1) + torch.trace(sigma2) - 2 * trace_sqrt).item()
+
+
+class DiscriminatorFeatureExtractor:
+    def __init__(self, discriminator, frozen=True):
+        """
+        Utilise l'avant-dernière couche du discriminateur entraîné comme
+        extracteur de caractéristiques (toutes les couches sauf la sortie).
+
+        frozen: par défaut, une copie du discriminateur est figée à la première
+        évaluation et sert pour toutes les suivantes : les statistiques réelles
+        sont calculées une fois puis relues depuis le cache disque. Avec
+        frozen=False, le discriminateur courant est utilisé ; le cache, indexé
+        par une empreinte des poids, n'est alors gardé qu'en mémoire et
+        recalculé dès que le discriminateur a changé.
+        """
+        self.discriminator = discriminator
+        self.frozen = frozen
+        self.persistent = frozen
+        self._snapshot = None
+        self._snapshot_id = None
+
+    def _features_model(self):
+        if not self.frozen:
+            return self.discriminator[:-1]
+        if self._snapshot is None:
+            self._snapshot = copy.deepcopy(self.discriminator[:-1]).eval()
+            self._snapshot.requires_grad_(False)
+            self._snapshot_id = self._fingerprint(self._snapshot)
+        return self._snapshot
+
+    @staticmethod
+    def _fingerprint(model):
+        digest = hashlib.sha1()
+        # Paramètres seulement : les buffers de BatchNorm n'évoluent qu'avec
+        # eux, pendant l'entraînement du discriminateur
+        for param in model.parameters():
+            digest.update(param.detach().cpu().contiguous().reshape(-1).view(torch.uint8).numpy().tobytes())
+        return digest.hexdigest()[:12]
+
+    @property
+    def cache_id(self):
+        if self.frozen:
+            self._features_model()
+            return self._snapshot_id
+        return self._fingerprint(self.discriminator)
+
+    def __call__(self, images):
+        model = self._features_model()
+        was_training = model.training
+        model.eval()
+        try:
+            features = model(images)
+        finally:
+            model.train(was_training)
+        return features.reshape(features.size(0), -1)
+
+
+class CheckpointFeatureExtractor:
+    def __init__(self, checkpoint_path, device=None):
+        """
+        Charge un extracteur figé depuis un fichier TorchScript (torch.jit.save)
+        ou un module complet sauvegardé avec torch.save.
+        """
+        self.device = device if device else torch.device("cpu")
+        try:
+            self.model = torch.jit.load(checkpoint_path, map_location=self.device)
+        except RuntimeError:
+            self.model = torch.load(checkpoint_path, map_location=self.device, weights_only=False)
+        self.model.eval()
+        self.persistent = True
+        with open(checkpoint_path, "rb") as f:
+            self.cache_id = hashlib.sha1(f.read()).hexdigest()[:12]
+
+    def __call__(self, images):
+        features = self.model(images.to(self.device))
+        return features.reshape(features.size(0), -1)
+
+
+class FrechetEvaluator:
+    def __init__(self, feature_extractor, cache_dir="fid_cache", device=None):
+        """
+        feature_extractor: callable images -> caractéristiques (N, D)
+        cache_dir: dossier où sont stockées les statistiques des données réelles
+        """
+        self.feature_extractor = feature_extractor
+        self.cache_dir = cache_dir
+        self.device = device if device else torch.device("cpu")
+        self._memory_cache = {}
+
+    def _cache_key(self, dataset_key, image_size):
+        dataset_hash = hashlib.sha1(os.path.abspath(dataset_key).encode()).hexdigest()[:12]
+        return f"real_{dataset_hash}_{image_size}_{self.feature_extractor.cache_id}"
+
+    @torch.no_grad()
+    def _accumulate(self, batches):
+        stats = RunningStatistics()
+        for images in batches:
+            stats.update(self.feature_extractor(images.to(self.device)))
+        return stats
+
+    def real_statistics(self, data_loader, dataset_key, image_size):
+        """
+        Statistiques des données réelles, calculées une seule fois par
+        (jeu de données, image_size, extracteur) puis relues depuis le disque.
+        """
+        key = self._cache_key(dataset_key, image_size)
+        if key in self._memory_cache:
+            return self._memory_cache[key]
+
+        persistent = getattr(self.feature_extractor, "persistent", True)
+        path = os.path.join(self.cache_dir, key + ".pt")
+        if persistent and os.path.exists(path):
+            stats = RunningStatistics.from_state_dict(torch.load(path))
+        else:
+            stats = self._accumulate(images for images, _ in data_loader)
+            if persistent:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                torch.save(stats.state_dict(), path)
+        # Un seul jeu de statistiques réelles est gardé en mémoire
+        self._memory_cache = {key: stats}
+        return stats
+
+    def generated_statistics(self, generator, num_samples=1000, batch_size=100):
+        latent_size = get_latent_size(generator)
+        was_training = generator.training
+        generator.eval()
+
+        def batches():
+            remaining = num_samples
+            while remaining > 0:
+                n = min(batch_size, remaining)
+                remaining -= n
+                yield generator(torch.randn(n, latent_size, device=self.device))
+
+        try:
+            return self._accumulate(batches())
+        finally:
+            generator.train(was_training)
+
+    def evaluate(self, generator, data_loader, dataset_key, image_size, num_samples=1000, batch_size=100):
+        real = self.real_statistics(data_loader, dataset_key, image_size)
+        fake = self.generated_statistics(generator, num_samples, batch_size)
+        return frechet_distance(real.mean, real.covariance(), fake.mean, fake.covariance())
+
+
+def build_evaluator(eval_config, discriminator, device=None):
+    """
+    eval_config: dict, par exemple :
+        {
+            "interval": 5,                  # évaluation toutes les 5 epochs
+            "num_samples": 1000,
+            "batch_size": 100,
+            "feature_extractor": "discriminator",  # copie figée du discriminateur,
+                                                   # "discriminator_live" ou chemin vers un checkpoint
+            "cache_dir": "fid_cache"
+        }
+    """
+    extractor_name = eval_config.get("feature_extractor", "discriminator")
+    if extractor_name in ("discriminator", "discriminator_live"):
+        extractor = DiscriminatorFeatureExtractor(discriminator, frozen=extractor_name == "discriminator")
+    else:
+        extractor = CheckpointFeatureExtractor(extractor_name, device)
+    return FrechetEvaluator(extractor, eval_config.get("cache_dir", "fid_cache"), device)
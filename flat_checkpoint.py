@@ -0,0 +1,160 @@
+import argparse
+import json
+import math
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+
+import torch
+
+# Format : MAGIC, longueur de l'en-tête (uint64 little-endian), en-tête JSON,
+# puis les données brutes de chaque tenseur alignées sur ALIGNMENT octets.
+# Les offsets de l'en-tête sont relatifs au début de la zone de données.
+MAGIC = b"GANFLAT1"
+ALIGNMENT = 64
+FLAT_EXTENSION = ".flat"
+
+
+def _align(value):
+    return (value + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_flat(state_dict, path, metadata=None):
+    """Écrit un state_dict au format plat (écriture atomique)."""
+    tensors = {name: tensor.detach().to("cpu").contiguous() for name, tensor in state_dict.items()}
+    entries = {}
+    offset = 0
+    for name, tensor in tensors.items():
+        nbytes = tensor.numel() * tensor.element_size()
+        entries[name] = {
+            "dtype": str(tensor.dtype).replace("torch.", ""),
+            "shape": list(tensor.shape),
+            "offset": offset,
+            "nbytes": nbytes
+        }
+        offset = _align(offset + nbytes)
+    header = json.dumps({"tensors": entries, "metadata": metadata or {}}).encode()
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, tensor in tensors.items():
+            f.seek(data_start + entries[name]["offset"])
+            if tensor.numel():
+                f.write(memoryview(tensor.reshape(-1).view(torch.uint8).numpy()))
+        # Le fichier couvre toute la zone de données, padding final compris
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def is_flat_checkpoint(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class FlatCheckpoint(Mapping):
+    def __init__(self, path):
+        """
+        Checkpoint plat projeté en mémoire. Chaque tenseur n'est construit qu'à
+        son premier accès, comme une vue sur le fichier : rien n'est lu ni
+        copié tant que les pages ne sont pas touchées.
+
+        Le mapping est privé (copie à l'écriture) : les pages restent partagées
+        via le cache du système entre tous les processus qui servent le même
+        modèle, et un processus qui modifie un poids n'en copie que les pages
+        concernées.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} n'est pas un checkpoint plat.")
+            (header_size,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_size))
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        self.entries = header["tensors"]
+        self.metadata = header["metadata"]
+        self._data_start = _align(len(MAGIC) + 8 + header_size)
+
+    def __getitem__(self, name):
+        entry = self.entries[name]
+        dtype = getattr(torch, entry["dtype"])
+        if entry["nbytes"] == 0:
+            return torch.empty(entry["shape"], dtype=dtype)
+        tensor = torch.frombuffer(
+            self._mmap, dtype=dtype,
+            count=math.prod(entry["shape"]),
+            offset=self._data_start + entry["offset"]
+        )
+        return tensor.reshape(entry["shape"])
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def nbytes(self):
+        return sum(entry["nbytes"] for entry in self.entries.values())
+
+
+def load_weights(path, map_location=None):
+    """
+    State_dict d'un fichier de poids : format plat (projeté en mémoire,
+    reconnu à son en-tête) ou fichier torch.save classique.
+    """
+    if is_flat_checkpoint(path):
+        return FlatCheckpoint(path)
+    return torch.load(path, map_location=map_location)
+
+
+def save_weights(state_dict, path):
+    """Format plat si le chemin se termine par FLAT_EXTENSION, torch.save sinon."""
+    if path.endswith(FLAT_EXTENSION):
+        save_flat(state_dict, path)
+    else:
+        torch.save(state_dict, path)
+
+
+def load_into(module, path, device=None, assign=False):
+    """
+    Charge des poids dans un module. Avec assign=True sur CPU, les paramètres
+    d'un checkpoint plat deviennent directement les vues du fichier, sans
+    copie : les objets Parameter sont remplacés, ce qui ne convient qu'à un
+    module sans optimiseur (service). Sinon les poids sont copiés dans les
+    paramètres existants.
+    """
+    device = device if device else torch.device("cpu")
+    state_dict = load_weights(path, map_location=device)
+    if assign and isinstance(state_dict, FlatCheckpoint) and torch.device(device).type == "cpu":
+        module.load_state_dict(state_dict, assign=True)
+    else:
+        module.load_state_dict(state_dict)
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpoints plats projetés en mémoire")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    convert = subparsers.add_parser("convert", help="Convertit un fichier torch.save en checkpoint plat")
+    convert.add_argument("source")
+    convert.add_argument("destination")
+    info = subparsers.add_parser("info", help="Liste les tenseurs d'un checkpoint plat")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        save_flat(torch.load(args.source, map_location="cpu"), args.destination)
+        print(f"{args.source} -> {args.destination}")
+    else:
+        checkpoint = FlatCheckpoint(args.path)
+        for name, entry in checkpoint.entries.items():
+            print(f"{name:<40} {entry['dtype']:<10} {str(tuple(entry['shape'])):<22} {entry['nbytes']:>12} octets")
+        print(f"{len(checkpoint)} tenseurs, {checkpoint.nbytes() / (1024 * 1024):.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
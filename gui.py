@@ -1,4 +1,73 @@
+import argparse
+import io
+import time
 import gradio as gr
+from job_queue import JobQueue, QueueError
+
+# File partagée par toutes les sessions (créée au premier usage)
+job_queue = None
+queue_settings = {"workers": 2, "max_queued": 16, "max_queued_per_user": 2, "max_running_per_user": 1}
+
+
+def get_job_queue():
+    global job_queue
+    if job_queue is None:
+        job_queue = JobQueue(**queue_settings)
+    return job_queue
+
+
+def current_user(request):
+    """
+    Identifiant de l'utilisateur pour les limites de la file : le login
+    Gradio si l'authentification est active (--auth). Sans authentification,
+    l'adresse du client : un onglet ou un rechargement ne contourne plus les
+    limites, mais des collègues derrière un même proxy / NAT les partagent.
+    """
+    username = getattr(request, "username", None)
+    if username:
+        return username
+    client = getattr(request, "client", None)
+    host = getattr(client, "host", None)
+    return f"ip:{host}" if host else request.session_hash
+
+
+def load_auth(path):
+    """Fichier d'identifiants : une ligne « utilisateur:mot de passe » par compte."""
+    with open(path) as f:
+        return [tuple(line.strip().split(":", 1)) for line in f if ":" in line]
+
+
+def rows_to_layers(rows, activation):
+    layers = []
+    for row in rows or []:
+        if not row or not row[0]:
+            continue
+        layer = {"layer_type": str(row[0]), "activation": activation}
+        if row[1] not in (None, ""):
+            layer["units"] = int(row[1])
+        if row[2] not in (None, ""):
+            layer["kernel_size"] = int(row[2])
+        layers.append(layer)
+    return layers
+
+
+def render_job(job):
+    position = get_job_queue().position(job)
+    header = f"Tâche {job.id} - {job.status}"
+    if position:
+        header += f" (position {position} dans la file)"
+    if job.error:
+        header += f"\n{job.error}"
+    return header + "\n" + "\n".join(list(job.events)[-20:])
+
+
+def preview_image(job):
+    png = job.preview()
+    if png is None:
+        return None
+    from PIL import Image
+    return Image.open(io.BytesIO(png))
+
 
 with gr.Blocks() as demo:
     gr.Markdown("# Configuration d'un Réseau GAN")
@@ -13,6 +82,7 @@ with gr.Blocks() as demo:
                 headers=["Layer Type", "Units/Filters", "Kernel Size"],
                 datatype=["str", "number", "number"],
                 row_count=(1, "dynamic"),
+                type="array",
                 label="Couches du Générateur"
             )
             gen_activation = gr.Dropdown(
@@ -50,6 +120,7 @@ with gr.Blocks() as demo:
                 headers=["Layer Type", "Units/Filters", "Kernel Size"],
                 datatype=["str", "number", "number"],
                 row_count=(1, "dynamic"),
+                type="array",
                 label="Couches du Discriminateur"
             )
             disc_activation = gr.Dropdown(
@@ -87,23 +158,111 @@ with gr.Blocks() as demo:
                 choices=["Générateur", "Discriminateur"],
                 value="Générateur"
             )
+            with gr.Row():
+                data_folder = gr.Textbox(label="Dossier de données (sur le serveur)")
+                loss_function = gr.Dropdown(
+                    label="Fonction de perte",
+                    choices=["BCEWithLogitsLoss", "MSELoss", "BCELoss"],
+                    value="BCEWithLogitsLoss"
+                )
+            with gr.Row():
+                epochs = gr.Number(label="Nombre d'epochs", value=10, precision=0)
+                batch_size = gr.Number(label="Taille du batch", value=32, precision=0)
+                learning_rate = gr.Number(label="Learning Rate", value=0.001)
+            job_id = gr.State(None)
+            with gr.Row():
+                start_btn = gr.Button("Lancer l'Entraînement", variant="primary")
+                cancel_btn = gr.Button("Annuler")
             pause_btn = gr.Button("Pause Entraînement")
             resume_btn = gr.Button("Reprendre Entraînement")
             switch_btn = gr.Button("Switcher Réseau")
-            training_stats = gr.Textbox(label="Statistiques d'Entraînement", interactive=False, lines=5)
+            training_stats = gr.Textbox(label="Statistiques d'Entraînement", interactive=False, lines=12)
+            samples = gr.Image(label="Échantillons générés", interactive=False)
+
+            def start_training(gen_layers, gen_activation, disc_layers, disc_activation, choice,
+                               folder, n_epochs, n_batch, lr, loss, current_job, request: gr.Request):
+                user = current_user(request)
+                params = {
+                    "loss_function": loss,
+                    "learning_rate": float(lr),
+                    "epochs": int(n_epochs),
+                    "batch_size": int(n_batch)
+                }
+                gen_config = {
+                    "input_size": 100,
+                    "output_size": 64,
+                    "global_activation": gen_activation,
+                    "layers": rows_to_layers(gen_layers, gen_activation)
+                }
+                disc_config = {
+                    "input_size": (64, 64),
+                    "output_size": 1,
+                    "global_activation": disc_activation,
+                    "layers": rows_to_layers(disc_layers, disc_activation)
+                }
+                training_config = {
+                    "generator": dict(params),
+                    "discriminator": dict(params),
+                    "batch_size": int(n_batch),
+                    "data_folder": folder,
+                    "initial_network": choice.lower(),
+                    "preview": {"interval": 5.0, "num_samples": 16}
+                }
+                try:
+                    job = get_job_queue().submit(user, gen_config, disc_config, training_config)
+                except (QueueError, ValueError) as e:
+                    yield current_job, str(e), None
+                    return
+                # Progression diffusée à cette session uniquement, jusqu'à la fin de sa tâche
+                while True:
+                    yield job.id, render_job(job), preview_image(job)
+                    if job.done:
+                        break
+                    time.sleep(1)
 
-            def pause_training():
-                return "Entraînement mis en pause."
+            def session_job(current_job, request):
+                job = get_job_queue().jobs.get(current_job)
+                if job is None or job.user != current_user(request):
+                    return None
+                return job
 
-            def resume_training():
-                return "Entraînement repris."
+            def cancel_training(current_job, request: gr.Request):
+                job = session_job(current_job, request)
+                if job is None or not get_job_queue().cancel(job.id, job.user):
+                    return "Aucune tâche à annuler."
+                return render_job(job)
 
-            def switch_training():
-                return "Switch effectué : changement du réseau à entraîner."
+            def control(action, message):
+                def handler(current_job, request: gr.Request):
+                    job = session_job(current_job, request)
+                    if job is None or job.controller is None:
+                        return "Aucun entraînement en cours."
+                    getattr(job.controller, action)()
+                    job.log(message)
+                    return render_job(job)
+                return handler
 
-            pause_btn.click(fn=pause_training, inputs=[], outputs=training_stats)
-            resume_btn.click(fn=resume_training, inputs=[], outputs=training_stats)
-            switch_btn.click(fn=switch_training, inputs=[], outputs=training_stats)
+            def switch_training(current_job, request: gr.Request):
+                # Le worker de la tâche enchaîne lui-même sur l'autre réseau (voir Job.switch)
+                job = session_job(current_job, request)
+                if job is None or not job.switch():
+                    return "Aucun entraînement en cours."
+                job.log("Switch effectué : changement du réseau à entraîner.")
+                return render_job(job)
+
+            start_btn.click(
+                fn=start_training,
+                inputs=[gen_layers_df, gen_activation, disc_layers_df, disc_activation, train_choice,
+                        data_folder, epochs, batch_size, learning_rate, loss_function, job_id],
+                outputs=[job_id, training_stats, samples],
+                concurrency_limit=None
+            )
+            cancel_btn.click(fn=cancel_training, inputs=[job_id], outputs=training_stats)
+            pause_btn.click(fn=control("pause_training", "Entraînement mis en pause."),
+                            inputs=[job_id], outputs=training_stats)
+            resume_btn.click(fn=control("resume_training", "Entraînement repris."),
+                             inputs=[job_id], outputs=training_stats)
+            switch_btn.click(fn=switch_training, inputs=[job_id], outputs=training_stats)
 
         ## Onglet "Résumé de la Configuration"
         with gr.Tab("Résumé de la Configuration"):
@@ -141,4 +300,27 @@ with gr.Blocks() as demo:
                 outputs=config_summary
             )
 
-demo.launch()
+def main():
+    parser = argparse.ArgumentParser(description="Interface Gradio multi-utilisateurs")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=7860)
+    parser.add_argument("--workers", type=int, default=2, help="Entraînements simultanés")
+    parser.add_argument("--max-queued", type=int, default=16)
+    parser.add_argument("--max-per-user", type=int, default=2, help="Tâches en attente ou en cours par utilisateur")
+    parser.add_argument("--max-running-per-user", type=int, default=1)
+    parser.add_argument("--auth", default=None,
+                        help="Fichier « utilisateur:mot de passe » ; sans lui, les limites s'appliquent par adresse IP")
+    args = parser.parse_args()
+
+    queue_settings.update(
+        workers=args.workers,
+        max_queued=args.max_queued,
+        max_queued_per_user=args.max_per_user,
+        max_running_per_user=args.max_running_per_user
+    )
+    auth = load_auth(args.auth) if args.auth else None
+    demo.queue().launch(server_name=args.host, server_port=args.port, auth=auth)
+
+
+if __name__ == "__main__":
+    main()
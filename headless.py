@@ -0,0 +1,123 @@
+import argparse
+import json
+import signal
+import sys
+import time
+
+# Codes de sortie
+EXIT_OK = 0
+EXIT_TRAINING_ERROR = 1
+EXIT_CONFIG_ERROR = 2
+EXIT_INTERRUPTED = 130
+
+
+def load_config(path):
+    """
+    Charge un fichier JSON ou YAML de la forme :
+        {
+            "gen_config": {...},
+            "disc_config": {...},
+            "training_config": {...},
+            "phases": ["discriminateur", "générateur"]   # optionnel
+        }
+    Sans "phases", seul training_config["initial_network"] est entraîné.
+    """
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML est nécessaire pour lire une configuration YAML (pip install pyyaml).")
+            config = yaml.safe_load(f)
+        else:
+            config = json.load(f)
+    for key in ("gen_config", "disc_config", "training_config"):
+        if not isinstance(config.get(key), dict):
+            raise ValueError(f"Section '{key}' manquante ou invalide dans {path}")
+    return config
+
+
+class EventWriter:
+    def __init__(self, stream):
+        """Écrit un événement JSON par ligne (stdout ou fichier journal)."""
+        self.stream = stream
+
+    def __call__(self, event):
+        self.stream.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+        self.stream.flush()
+
+    def message(self, text):
+        self({"type": "message", "time": time.time(), "message": text})
+
+
+def run(config, writer, threads=None):
+    import torch
+    from controller import GANController
+
+    if threads:
+        # Indispensable pour lancer plusieurs instances en parallèle sans sursouscription
+        torch.set_num_threads(threads)
+
+    training_config = config["training_config"]
+    phases = config.get("phases") or [training_config.get("initial_network", "générateur")]
+    controller = GANController(config["gen_config"], config["disc_config"], training_config)
+    controller.add_listener(writer)
+    controller.apply_placement(threads)
+    if controller.placement_note:
+        writer.message(controller.placement_note)
+    phases = controller.training_phases(phases)
+
+    interrupted = []
+
+    def handle_signal(signum, frame):
+        # Aucun verrou ici : le signal interrompt le thread de la boucle elle-même
+        interrupted.append(signum)
+        controller.trainer.request_stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    for phase in phases:
+        if interrupted:
+            break
+        controller.trainer.current_network = phase
+        writer({"type": "phase", "time": time.time(), "network": phase})
+        controller.run_training(writer.message)
+    return EXIT_INTERRUPTED if interrupted else EXIT_OK
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Entraînement GAN sans interface graphique")
+    parser.add_argument("config", help="Fichier de configuration JSON ou YAML")
+    parser.add_argument("--log", default=None, help="Fichier JSON lines pour la progression (défaut : stdout)")
+    parser.add_argument("--threads", type=int, default=None, help="Nombre de threads torch")
+    args = parser.parse_args(argv)
+
+    stream = open(args.log, "a") if args.log else sys.stdout
+    writer = EventWriter(stream)
+    start = time.time()
+    try:
+        try:
+            config = load_config(args.config)
+        except (OSError, ValueError) as e:
+            writer({"type": "end", "time": time.time(), "status": "config_error", "error": str(e)})
+            return EXIT_CONFIG_ERROR
+
+        writer({"type": "start", "time": start, "config": args.config})
+        try:
+            status = run(config, writer, args.threads)
+        except Exception as e:
+            writer({"type": "end", "time": time.time(), "status": "error",
+                    "error": f"{type(e).__name__}: {e}", "duration_s": time.time() - start})
+            return EXIT_TRAINING_ERROR
+
+        writer({"type": "end", "time": time.time(), "status": "ok" if status == EXIT_OK else "interrupted",
+                "duration_s": time.time() - start})
+        return status
+    finally:
+        if args.log:
+            stream.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
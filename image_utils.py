@@ -0,0 +1,48 @@
+import math
+import torch
+
+
+def as_images(batch):
+    """
+    Remet une sortie de générateur sous forme (N, C, H, W).
+    Les sorties Dense (N, C*H*W) sont dépliées en images carrées RGB ou niveaux de gris.
+    """
+    if batch.dim() == 4:
+        return batch
+    if batch.dim() != 2:
+        raise ValueError(f"Forme de sortie non supportée : {tuple(batch.shape)}")
+    features = batch.size(1)
+    for channels in (3, 1):
+        side = math.isqrt(features // channels)
+        if channels * side * side == features:
+            return batch.reshape(batch.size(0), channels, side, side)
+    raise ValueError(f"Impossible d'interpréter {features} sorties comme une image carrée.")
+
+
+def to_uint8(images):
+    """Convertit des images normalisées dans [-1, 1] en tenseur uint8 (N, C, H, W) sur CPU."""
+    images = as_images(images.detach())
+    return images.mul(127.5).add_(127.5).clamp_(0, 255).round_().to("cpu", torch.uint8)
+
+
+def make_grid(images, nrow=8, padding=2):
+    """Assemble un batch uint8 (N, C, H, W) en une seule image (C, H', W')."""
+    n, c, h, w = images.shape
+    ncol = min(nrow, n)
+    nrows = math.ceil(n / ncol)
+    grid = torch.zeros(
+        c, nrows * (h + padding) + padding, ncol * (w + padding) + padding,
+        dtype=images.dtype
+    )
+    for index in range(n):
+        row, col = divmod(index, ncol)
+        top = padding + row * (h + padding)
+        left = padding + col * (w + padding)
+        grid[:, top:top + h, left:left + w] = images[index]
+    return grid
+
+
+def encode_png(image, compression_level=6):
+    """Encode une image uint8 (C, H, W) en PNG (bytes)."""
+    from torchvision.io import encode_png as _encode_png
+    return _encode_png(image.contiguous(), compression_level=compression_level).numpy().tobytes()
@@ -0,0 +1,210 @@
+import collections
+import itertools
+import threading
+import time
+
+
+class QueueError(Exception):
+    """Soumission refusée (file pleine ou limite par utilisateur atteinte)."""
+
+
+class Job:
+    def __init__(self, job_id, user, gen_config, disc_config, training_config, phases=None, max_events=500):
+        self.id = job_id
+        self.user = user
+        self.gen_config = gen_config
+        self.disc_config = disc_config
+        self.training_config = training_config
+        self.phases = phases or [training_config.get("initial_network", "générateur")]
+        self.status = "en attente"
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.controller = None
+        self.last_preview = None
+        self.events = collections.deque(maxlen=max_events)
+        self.cancelled = threading.Event()
+        self.switch_requested = threading.Event()
+        # Vrai pendant qu'une boucle de phase tourne (les switchs hors boucle sont refusés)
+        self.loop_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.status in ("terminé", "échec", "annulé")
+
+    def log(self, message):
+        self.events.append(message)
+
+    def cancel(self):
+        self.cancelled.set()
+        if self.controller is not None:
+            self.controller.trainer.stop()
+
+    def switch(self):
+        """
+        Switch d'une tâche de la file : la boucle courante s'arrête au prochain
+        pas et le worker enchaîne, dans son propre thread, sur l'autre réseau,
+        repris à son dernier epoch terminé (une pause en cours est levée).
+        Retourne False si aucune boucle ne tourne ou en mode progressif.
+        """
+        with self._lock:
+            controller = self.controller
+            if controller is None or not self.loop_running or not controller.can_switch():
+                return False
+            self.switch_requested.set()
+            controller.trainer.stop()
+            return True
+
+    def preview(self):
+        """Dernière mosaïque PNG de l'aperçu, ou None."""
+        controller = self.controller
+        if controller is None or controller.previewer is None:
+            return self.last_preview
+        return controller.previewer.latest()[1]
+
+
+class JobQueue:
+    def __init__(self, workers=2, max_queued=16, max_queued_per_user=2, max_running_per_user=1, max_finished=50):
+        """
+        File d'entraînements partagée entre plusieurs utilisateurs.
+
+        workers: nombre d'entraînements exécutés en parallèle
+        max_queued: taille maximale de la file (tous utilisateurs confondus)
+        max_queued_per_user: tâches en attente ou en cours autorisées par utilisateur
+        max_running_per_user: tâches d'un même utilisateur exécutées simultanément
+        max_finished: tâches terminées conservées pour consultation (les plus anciennes sont oubliées)
+        Les workers servent les utilisateurs à tour de rôle : une configuration
+        lourde n'occupe jamais plus de max_running_per_user workers.
+        """
+        self.max_queued = max_queued
+        self.max_queued_per_user = max_queued_per_user
+        self.max_running_per_user = max_running_per_user
+        self.max_finished = max_finished
+        self.jobs = {}
+        self._pending = []
+        self._running = collections.Counter()
+        self._last_served = {}
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._worker_loop, daemon=True, name=f"gan-worker-{i}")
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, user, gen_config, disc_config, training_config, phases=None):
+        with self._condition:
+            if len(self._pending) >= self.max_queued:
+                raise QueueError("La file d'attente est pleine, réessayez plus tard.")
+            active = sum(1 for job in self.jobs.values() if job.user == user and not job.done)
+            if active >= self.max_queued_per_user:
+                raise QueueError(f"Limite de {self.max_queued_per_user} entraînement(s) par utilisateur atteinte.")
+            job = Job(next(self._ids), user, gen_config, disc_config, training_config, phases)
+            self.jobs[job.id] = job
+            self._pending.append(job)
+            job.log(f"Tâche {job.id} ajoutée à la file (position {len(self._pending)}).")
+            self._condition.notify()
+            return job
+
+    def cancel(self, job_id, user):
+        with self._condition:
+            job = self.jobs.get(job_id)
+            if job is None or job.user != user:
+                return False
+            if job in self._pending:
+                self._pending.remove(job)
+                job.status = "annulé"
+                job.finished = time.time()
+                self._forget_finished()
+            job.cancel()
+            job.log("Annulation demandée.")
+            return True
+
+    def jobs_for(self, user):
+        return [job for job in self.jobs.values() if job.user == user]
+
+    def position(self, job):
+        with self._condition:
+            return self._pending.index(job) + 1 if job in self._pending else 0
+
+    def _next_job(self):
+        """Tâche éligible de l'utilisateur servi le moins récemment (à appeler sous verrou)."""
+        eligible = [job for job in self._pending if self._running[job.user] < self.max_running_per_user]
+        if not eligible:
+            return None
+        job = min(eligible, key=lambda j: (self._last_served.get(j.user, 0), j.created))
+        self._pending.remove(job)
+        self._running[job.user] += 1
+        self._last_served[job.user] = time.monotonic()
+        return job
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    self._condition.wait()
+                    job = self._next_job()
+            try:
+                self._run(job)
+            finally:
+                with self._condition:
+                    self._running[job.user] -= 1
+                    self._forget_finished()
+                    self._condition.notify_all()
+
+    def _forget_finished(self):
+        """Ne garde que les max_finished tâches terminées les plus récentes (à appeler sous verrou)."""
+        finished = sorted((job for job in self.jobs.values() if job.done), key=lambda job: job.finished)
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job.id]
+
+    def _run(self, job):
+        from controller import GANController
+
+        job.status = "en cours"
+        job.started = time.time()
+        status = "échec"
+        try:
+            job.controller = GANController(job.gen_config, job.disc_config, job.training_config)
+            controller = job.controller
+            phases = controller.training_phases(job.phases)
+            # Epochs terminés par réseau : un switch reprend l'autre réseau où il en était
+            completed = {}
+            index = 0
+            while index < len(phases) and not job.cancelled.is_set():
+                network = phases[index]
+                controller.trainer.current_network = network
+                controller.progress = {"phase": index, "epoch": completed.get(network, 0)}
+                with job._lock:
+                    job.loop_running = True
+                controller.run_training(job.log, start_epoch=completed.get(network, 0) + 1)
+                with job._lock:
+                    job.loop_running = False
+                    switched = job.switch_requested.is_set()
+                    job.switch_requested.clear()
+                completed[network] = max(completed.get(network, 0), controller.trainer.completed_epochs)
+                if switched and not job.cancelled.is_set():
+                    # La phase interrompue se poursuit avec l'autre réseau
+                    phases[index] = "discriminateur" if network == "générateur" else "générateur"
+                    continue
+                index += 1
+            status = "annulé" if job.cancelled.is_set() else "terminé"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.log(f"Erreur : {job.error}")
+        finally:
+            controller = job.controller
+            if controller is not None and controller.previewer is not None:
+                job.last_preview = controller.previewer.latest()[1]
+                controller.previewer.close()
+            # Libère réseaux, optimiseurs et données : seuls le journal et le dernier aperçu restent
+            with job._lock:
+                job.loop_running = False
+                job.controller = None
+            job.finished = time.time()
+            # En dernier : une session qui voit la tâche finie trouve déjà l'aperçu final
+            job.status = status
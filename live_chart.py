@@ -0,0 +1,196 @@
+import math
+import queue
+import tkinter as tk
+from array import array
+
+
+class DecimatedSeries:
+    def __init__(self, max_buckets=2048):
+        """
+        Historique d'une courbe dans des tableaux compacts (array('d')) : au
+        plus max_buckets intervalles (premier pas, dernier pas, min, max).
+        Quand ils sont pleins, ils sont fusionnés deux à deux et leur largeur
+        double. Le rendu ne dépend donc jamais du nombre total de points.
+        """
+        self.max_buckets = max_buckets
+        self.bucket_size = 1
+        self.count = 0
+        self.starts = array("d")
+        self.ends = array("d")
+        self.mins = array("d")
+        self.maxs = array("d")
+        self._pending_count = 0
+        self._pending_start = 0.0
+        self._pending_end = 0.0
+        self._pending_min = math.inf
+        self._pending_max = -math.inf
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value, step=None):
+        """step : pas global de l'entraînement (par défaut, l'indice du point)."""
+        step = self.count if step is None else step
+        if not self._pending_count:
+            self._pending_start = step
+        self._pending_end = step
+        self._pending_min = min(self._pending_min, value)
+        self._pending_max = max(self._pending_max, value)
+        self._pending_count += 1
+        self.count += 1
+        if self._pending_count < self.bucket_size:
+            return
+        self.starts.append(self._pending_start)
+        self.ends.append(self._pending_end)
+        self.mins.append(self._pending_min)
+        self.maxs.append(self._pending_max)
+        self._pending_count = 0
+        self._pending_min = math.inf
+        self._pending_max = -math.inf
+        if len(self.mins) >= self.max_buckets:
+            self._merge_buckets()
+
+    def _merge_buckets(self):
+        pairs = range(0, len(self.mins) - 1, 2)
+        self.starts = array("d", (self.starts[i] for i in pairs))
+        self.ends = array("d", (self.ends[i + 1] for i in pairs))
+        self.mins = array("d", (min(self.mins[i], self.mins[i + 1]) for i in pairs))
+        self.maxs = array("d", (max(self.maxs[i], self.maxs[i + 1]) for i in pairs))
+        self.bucket_size *= 2
+
+    def buckets(self):
+        """(débuts, fins, minimums, maximums), intervalle en cours compris."""
+        starts, ends, mins, maxs = self.starts, self.ends, self.mins, self.maxs
+        if self._pending_count:
+            starts = starts + array("d", [self._pending_start])
+            ends = ends + array("d", [self._pending_end])
+            mins = mins + array("d", [self._pending_min])
+            maxs = maxs + array("d", [self._pending_max])
+        return starts, ends, mins, maxs
+
+    def downsample(self, width):
+        """Réduction min/max à au plus `width` colonnes : liste de (premier pas, dernier pas, min, max)."""
+        starts, ends, mins, maxs = self.buckets()
+        if not mins:
+            return []
+        group = max(1, math.ceil(len(mins) / width))
+        columns = []
+        for start in range(0, len(mins), group):
+            end = min(start + group, len(mins))
+            columns.append((starts[start], ends[end - 1], min(mins[start:end]), max(maxs[start:end])))
+        return columns
+
+
+class LiveChart:
+    def __init__(self, parent, width=600, height=200, colors=None, refresh_ms=200, max_events_per_tick=20000):
+        """
+        Graphique Tk mis à jour en continu depuis le flux d'événements de l'entraînement.
+        on_event() peut être appelé depuis n'importe quel thread : les points passent
+        par une file, vidée par la boucle Tk toutes les refresh_ms millisecondes.
+        """
+        self.width = width
+        self.height = height
+        self.colors = colors or {"générateur": "#1f77b4", "discriminateur": "#d62728"}
+        self.refresh_ms = refresh_ms
+        self.max_events_per_tick = max_events_per_tick
+        self.margin = 40
+        self.series = {}
+        self._items = {}
+        self._events = queue.SimpleQueue()
+        self._dirty = False
+
+        self.canvas = tk.Canvas(parent, width=width, height=height, background="white")
+        self._axis_labels = [
+            self.canvas.create_text(self.margin - 4, 8, anchor="ne", font=("Arial", 8)),
+            self.canvas.create_text(self.margin - 4, height - 8, anchor="se", font=("Arial", 8)),
+            self.canvas.create_text(width - 4, height - 2, anchor="se", font=("Arial", 8)),
+        ]
+        self.canvas.create_rectangle(self.margin, 4, width - 4, height - 14, outline="#cccccc")
+        self._schedule()
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def on_event(self, event):
+        """Listener du Trainer : ne retient que les pertes par pas, placées à leur pas global."""
+        if event.get("type") == "step":
+            self._events.put((event["network"], event["loss"], event.get("step")))
+
+    def add_point(self, name, value, step=None):
+        self._events.put((name, value, step))
+
+    def _schedule(self):
+        self.canvas.after(self.refresh_ms, self._poll)
+
+    def _poll(self):
+        # Nombre borné d'événements par tick pour ne jamais bloquer la boucle Tk
+        for _ in range(self.max_events_per_tick):
+            try:
+                name, value, step = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if not math.isfinite(value):
+                continue
+            if name not in self.series:
+                self.series[name] = DecimatedSeries()
+            self.series[name].append(value, step)
+            self._dirty = True
+        if self._dirty:
+            self._redraw()
+            self._dirty = False
+        self._schedule()
+
+    def _redraw(self):
+        plot_width = self.width - self.margin - 8
+        top, bottom = 6, self.height - 16
+        columns = {name: series.downsample(plot_width) for name, series in self.series.items()}
+        non_empty = [c for c in columns.values() if c]
+        if not non_empty:
+            return
+        low = min(col[2] for cols in non_empty for col in cols)
+        high = max(col[3] for cols in non_empty for col in cols)
+        if high - low < 1e-12:
+            high = low + 1.0
+        # Axe x commun : les pas globaux, les deux réseaux alternant au fil des phases
+        first = min(cols[0][0] for cols in non_empty)
+        last = max(cols[-1][1] for cols in non_empty)
+        span = max(1.0, last - first)
+
+        def x_of(step):
+            return self.margin + 2 + (step - first) / span * plot_width
+
+        def y_of(value):
+            return bottom - (value - low) / (high - low) * (bottom - top)
+
+        for name, cols in columns.items():
+            if not cols:
+                continue
+            # Chaque colonne devient un segment vertical min -> max, reliés entre eux
+            coords = []
+            for start, end, vmin, vmax in cols:
+                x = x_of((start + end) / 2)
+                coords += [x, y_of(vmax), x, y_of(vmin)]
+            if len(coords) == 4:
+                coords += coords[:2]
+            item = self._items.get(name)
+            if item is None:
+                item = self.canvas.create_line(*coords, fill=self.colors.get(name, "black"), width=1)
+                self._items[name] = item
+            else:
+                self.canvas.coords(item, *coords)
+
+        self.canvas.itemconfigure(self._axis_labels[0], text=f"{high:.3g}")
+        self.canvas.itemconfigure(self._axis_labels[1], text=f"{low:.3g}")
+        self.canvas.itemconfigure(self._axis_labels[2], text=f"pas {first:.0f}-{last:.0f}")
+
+    def clear(self):
+        # Les points encore en file appartiennent à l'entraînement précédent
+        while True:
+            try:
+                self._events.get_nowait()
+            except queue.Empty:
+                break
+        for item in self._items.values():
+            self.canvas.delete(item)
+        self._items = {}
+        self.series = {}
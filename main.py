@@ -1,8 +1,24 @@
 # main.py
+import base64
+import importlib
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from controller import GANController
-from model_builder import detect_gpu
+from live_chart import LiveChart
+
+# .flat : checkpoint plat projeté en mémoire (flat_checkpoint), chargement sans copie
+MODEL_FILETYPES = [("PyTorch model", "*.pth"), ("Checkpoint plat", "*.flat")]
+
+
+def preload_backend():
+    """
+    Importe torch/torchvision via le contrôleur dans un thread d'arrière-plan :
+    la fenêtre s'affiche immédiatement et le chargement se termine pendant que
+    l'utilisateur configure les couches.
+    """
+    thread = threading.Thread(target=importlib.import_module, args=("controller",), daemon=True)
+    thread.start()
+    return thread
 
 class GanConfigurator:
     def __init__(self, root):
@@ -15,6 +31,7 @@ class GanConfigurator:
         
         # Instance du contrôleur GAN (sera créée lors du démarrage)
         self.gan_controller = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Création du Notebook
         self.notebook = ttk.Notebook(root)
@@ -259,6 +276,10 @@ class GanConfigurator:
         self.training_stats_text = tk.Text(frame, height=8, width=80)
         self.training_stats_text.pack(pady=5)
 
+        # Courbe des pertes en direct, alimentée par les événements du Trainer
+        self.loss_chart = LiveChart(frame, width=640, height=180)
+        self.loss_chart.pack(pady=5)
+
         # Ajout de boutons pour sauvegarder et charger les modèles
         save_load_frame = ttk.Frame(frame)
         save_load_frame.pack(pady=10)
@@ -282,7 +303,9 @@ class GanConfigurator:
     
     def switch_training(self):
         if self.gan_controller:
-            self.gan_controller.switch_network()
+            if not self.gan_controller.switch_network():
+                self.training_stats_text.insert(tk.END, "Switch impossible : l'entraînement progressif entraîne les deux réseaux.\n")
+                return
              # Mise à jour de l'interface pour refléter le changement
             current_choice = self.train_choice.get()
             new_choice = "Discriminateur" if current_choice == "Générateur" else "Générateur"
@@ -354,13 +377,16 @@ class GanConfigurator:
             }
             
             training_config["data_folder"] = self.data_folder.get()
+            training_config["preview"] = {"interval": 5.0, "num_samples": 16}
             training_config["initial_network"] = self.train_choice.get().lower()
             
         except Exception as e:
             messagebox.showerror("Erreur", "Erreur dans la configuration d'entraînement: " + str(e))
             return
         
-        # Création de l'instance du contrôleur GAN
+        # Création de l'instance du contrôleur GAN (attend la fin du préchargement si besoin)
+        from controller import GANController
+        self.close_previewer()
         self.gan_controller = GANController(gen_config, disc_config, training_config)
         
         # Callback pour afficher les mises à jour durant l'entraînement
@@ -368,19 +394,36 @@ class GanConfigurator:
             self.training_stats_text.insert(tk.END, message + "\n")
             self.training_stats_text.see(tk.END)
         
+        self.loss_chart.clear()
+        self.gan_controller.add_listener(self.loss_chart.on_event)
+        self.preview_version = 0
+        self.poll_preview()
+
         # Démarrage de l'entraînement dans un thread via le contrôleur
-        self.gan_controller.start_training(training_callback)
+        try:
+            self.gan_controller.start_training(training_callback)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Erreur", str(e))
+
+    def close_previewer(self):
+        """Arrête le worker d'aperçu du contrôleur courant (un par entraînement)."""
+        if self.gan_controller is not None and self.gan_controller.previewer is not None:
+            self.gan_controller.previewer.close()
+
+    def on_close(self):
+        self.close_previewer()
+        self.root.destroy()
 
     def save_model(self):
         if self.gan_controller:
-            file_path = filedialog.asksaveasfilename(defaultextension=".pth", filetypes=[("PyTorch model", "*.pth")])
+            file_path = filedialog.asksaveasfilename(defaultextension=".pth", filetypes=MODEL_FILETYPES)
             if file_path:
                 self.gan_controller.save_model(file_path)
                 messagebox.showinfo("Sauvegarde", "Modèle sauvegardé avec succès!")
 
     def load_model(self):
-        file_path = filedialog.askopenfilename(filetypes=[("PyTorch model", "*.pth")])
-        if file_path:
+        file_path = filedialog.askopenfilename(filetypes=MODEL_FILETYPES)
+        if file_path and self.gan_controller:
             self.gan_controller.load_model(file_path)
             messagebox.showinfo("Chargement", "Modèle chargé avec succès!")
     
@@ -397,6 +440,25 @@ class GanConfigurator:
         self.generated_images_frame.pack(pady=10)
         self.generated_images_label = ttk.Label(self.generated_images_frame, text="Images générées")
         self.generated_images_label.pack()
+        self.generated_images_canvas = ttk.Label(self.generated_images_frame)
+        self.generated_images_canvas.pack()
+        self.preview_version = 0
+        self.preview_job = None
+
+    def poll_preview(self):
+        """Affiche la dernière mosaïque terminée par le worker d'aperçu (aucun rendu dans la boucle Tk)."""
+        if self.preview_job is not None:
+            self.root.after_cancel(self.preview_job)
+        previewer = self.gan_controller.previewer if self.gan_controller else None
+        if previewer is None:
+            self.preview_job = None
+            return
+        version, png = previewer.latest()
+        if version != self.preview_version and png is not None:
+            self.preview_version = version
+            self.preview_image = tk.PhotoImage(data=base64.b64encode(png))
+            self.generated_images_canvas.configure(image=self.preview_image)
+        self.preview_job = self.root.after(500, self.poll_preview)
     
     def generate_summary(self):
         summary = "=== Générateur ===\n"
@@ -434,4 +496,5 @@ class GanConfigurator:
 if __name__ == "__main__":
     root = tk.Tk()
     app = GanConfigurator(root)
+    root.after_idle(preload_backend)
     root.mainloop()
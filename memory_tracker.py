@@ -0,0 +1,219 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# d_forward : passage du discriminateur sur les faux pendant un pas du générateur
+PHASES = ("data_fetch", "g_forward", "d_forward", "d_forward_backward", "g_backward", "optimizer_step")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_HAS_PROC = os.path.exists("/proc/self/statm")
+
+
+def process_rss(pid="self"):
+    """Mémoire résidente (octets) d'un processus, 0 s'il a disparu."""
+    if not _HAS_PROC:
+        # Hors Linux : seul le pic du processus courant est disponible
+        if resource is None or pid != "self":
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def process_pss(pid):
+    """
+    Mémoire proportionnelle (octets) : les pages partagées avec le processus
+    parent (workers créés par fork) ne sont comptées qu'au prorata.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return process_rss(pid)
+
+
+def child_pids(pid=None):
+    """PID de tous les descendants (workers du DataLoader compris)."""
+    if not _HAS_PROC:
+        return []
+    pending = [pid or os.getpid()]
+    children = []
+    while pending:
+        current = pending.pop()
+        try:
+            tasks = os.listdir(f"/proc/{current}/task")
+        except OSError:
+            continue
+        for task in tasks:
+            try:
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    found = [int(p) for p in f.read().split()]
+            except OSError:
+                continue
+            children += found
+            pending += found
+    return children
+
+
+class PhaseMemory:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.workers = 0
+        self.calls = 0
+
+    def as_dict(self):
+        mb = 1024 * 1024
+        return {
+            "current_mb": round(self.current / mb, 1),
+            "peak_mb": round(self.peak / mb, 1),
+            "workers_mb": round(self.workers / mb, 1),
+            "calls": self.calls
+        }
+
+
+class MemoryTracker:
+    def __init__(self, sample_interval=0.05, limit_mb=None, log_path=None, grace_period=2.0, growth_tolerance=0.05):
+        """
+        Suit la mémoire résidente (processus principal + workers du DataLoader)
+        pour chaque phase d'entraînement. Un thread échantillonne la mémoire
+        toutes les sample_interval secondes et attribue le pic à la phase en cours.
+
+        limit_mb: plafond au-delà duquel over_limit() devient vrai
+        grace_period: secondes de mesure après une réduction de batch (voir over_limit)
+        growth_tolerance: croissance relative tolérée au-delà du pic mesuré avec le nouveau batch
+        log_path: fichier JSON lines où sont ajoutés les rapports
+        Les workers sont mesurés en PSS pour ne pas recompter les pages
+        partagées avec le processus principal.
+        """
+        self.sample_interval = sample_interval
+        self.limit = limit_mb * 1024 * 1024 if limit_mb else None
+        self.log_path = log_path
+        self.phases = {name: PhaseMemory() for name in PHASES}
+        self.current_phase = None
+        self.last_total = 0
+        self.last_workers = 0
+        self.run_peak = 0
+        self.grace_period = grace_period
+        self.growth_tolerance = growth_tolerance
+        # Pic mesuré avec le batch réduit, et fin de la période de mesure
+        self.reduced_peak = None
+        self._grace_until = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reset(self):
+        with self._lock:
+            self.phases = {name: PhaseMemory() for name in PHASES}
+
+    def sample(self, include_workers=True):
+        """
+        Mesure la mémoire courante. Le parcours des workers est coûteux : aux
+        frontières de phase, seule la mémoire du processus principal est relue
+        et la dernière mesure du thread d'échantillonnage est réutilisée.
+        """
+        main = process_rss()
+        if include_workers:
+            self.last_workers = sum(process_pss(pid) for pid in child_pids())
+        workers = self.last_workers
+        total = main + workers
+        with self._lock:
+            self.last_total = total
+            self.run_peak = max(self.run_peak, total)
+            if self.reduced_peak is not None and time.monotonic() < self._grace_until:
+                self.reduced_peak = max(self.reduced_peak, total)
+            if self.current_phase is not None:
+                stats = self.phases[self.current_phase]
+                stats.current = total
+                stats.workers = workers
+                stats.peak = max(stats.peak, total)
+        return total
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            self.sample()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        previous = self.current_phase
+        self.current_phase = name
+        self.phases[name].calls += 1
+        self.sample(include_workers=False)
+        try:
+            yield
+        finally:
+            self.sample(include_workers=False)
+            self.current_phase = previous
+
+    def over_limit(self):
+        """
+        Vrai si le plafond est dépassé. Après une réduction de batch, la mémoire
+        libérée reste réservée par l'allocateur et la RSS ne redescend pas : le
+        pic est d'abord mesuré avec le nouveau batch pendant grace_period, puis
+        seule une croissance au-delà de ce pic (nouvelle fuite ou hausse réelle)
+        compte comme un dépassement.
+        """
+        if self.limit is None or self.last_total <= self.limit:
+            return False
+        with self._lock:
+            if self.reduced_peak is None:
+                return True
+            if time.monotonic() < self._grace_until:
+                return False
+            return self.last_total > self.reduced_peak * (1 + self.growth_tolerance)
+
+    def mark_reduced(self):
+        """À appeler après une réduction de batch (voir over_limit)."""
+        with self._lock:
+            self.reduced_peak = self.last_total
+            self._grace_until = time.monotonic() + self.grace_period
+
+    def report(self):
+        with self._lock:
+            return {
+                "time": time.time(),
+                "total_mb": round(self.last_total / (1024 * 1024), 1),
+                "run_peak_mb": round(self.run_peak / (1024 * 1024), 1),
+                "phases": {name: stats.as_dict() for name, stats in self.phases.items() if stats.calls}
+            }
+
+    def format_report(self, report=None):
+        report = report or self.report()
+        parts = [f"{name}: {p['peak_mb']:.0f} Mo (pic)" for name, p in report["phases"].items()]
+        return f"[Mémoire] Total {report['total_mb']:.0f} Mo - " + ", ".join(parts)
+
+    def log(self, **extra):
+        """Ajoute le rapport courant au journal de l'exécution et le retourne."""
+        report = self.report()
+        report.update(extra)
+        if self.log_path:
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(report) + "\n")
+        return report
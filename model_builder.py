@@ -17,11 +17,28 @@ class NetworkBuilder:
         self.global_activation = global_activation.lower()
         self.input_channels = input_channels
 
+    @classmethod
+    def from_config(cls, config, default_input_size, default_output_size):
+        """Crée un builder depuis un dict gen_config / disc_config."""
+        input_size = config.get("input_size", default_input_size)
+        if isinstance(input_size, list):
+            input_size = tuple(input_size)
+        return cls(
+            input_size,
+            config.get("layers", []),
+            config.get("output_size", default_output_size),
+            config.get("global_activation", "relu")
+        )
+
     def build_network(self):
         layers = []
+        # Pour chaque module, l'entrée de configuration dont il provient
+        layer_labels = []
+        layer_indices = []
         current_shape = self._get_initial_shape()
 
-        for config in self.layer_configs:
+        for index, config in enumerate(self.layer_configs):
+            first_module = len(layers)
             config = {k.lower(): v for k, v in config.items()}
             layer_type = config.get("layer_type", "dense").lower()
             activation = config.get("activation", self.global_activation).lower()
@@ -50,9 +67,24 @@ class NetworkBuilder:
             if "activation" in config:
                 layers.append(self._get_activation(activation))
 
+            layer_labels += [self._describe_layer(index, config)] * (len(layers) - first_module)
+            layer_indices += [index] * (len(layers) - first_module)
+
         # Ajout de la couche de sortie
         layers.append(self._add_output_layer(current_shape))
-        return nn.Sequential(*layers)
+        layer_labels.append("sortie")
+        layer_indices.append(None)
+        network = nn.Sequential(*layers)
+        network.layer_labels = layer_labels
+        network.layer_indices = layer_indices
+        return network
+
+    def _describe_layer(self, index, config):
+        details = ", ".join(
+            f"{key}={value}" for key, value in config.items()
+            if key != "layer_type" and value is not None
+        )
+        return f"couche {index} : {config.get('layer_type', 'dense')}({details})"
 
     def _get_initial_shape(self):
         if isinstance(self.input_size, tuple):
@@ -166,3 +198,13 @@ def detect_gpu():
     if torch.cuda.is_available():
         return f"{torch.cuda.device_count()} GPU(s) - {torch.cuda.get_device_name(0)}"
     return "Aucun GPU détecté"
+
+def get_latent_size(network):
+    """
+    Retourne la dimension du bruit attendue en entrée d'un réseau construit
+    par NetworkBuilder (in_features de la première couche Dense).
+    """
+    for module in network.modules():
+        if isinstance(module, nn.Linear):
+            return module.in_features
+    raise ValueError("Impossible de déterminer la taille d'entrée : aucune couche Dense trouvée.")
@@ -0,0 +1,193 @@
+import argparse
+import functools
+import glob
+import json
+import multiprocessing
+import os
+import re
+import time
+
+
+def parse_cpulist(text):
+    """'0-3,8,10-11' -> [0, 1, 2, 3, 8, 10, 11]"""
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-")
+            cpus += range(int(start), int(end) + 1)
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def allowed_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def detect_topology():
+    """
+    {nœud NUMA: [cœurs utilisables]} lu dans /sys, restreint aux cœurs
+    autorisés pour ce processus (conteneurs, taskset). Un seul nœud hors Linux.
+    """
+    allowed = set(allowed_cpus())
+    topology = {}
+    for path in glob.glob("/sys/devices/system/node/node*/cpulist"):
+        node = int(re.search(r"node(\d+)", path).group(1))
+        try:
+            with open(path) as f:
+                cpus = [cpu for cpu in parse_cpulist(f.read()) if cpu in allowed]
+        except OSError:
+            continue
+        if cpus:
+            topology[node] = cpus
+    return topology or {0: sorted(allowed)}
+
+
+class Placement:
+    def __init__(self, compute_cpus, worker_cpus, compute_node, worker_node):
+        self.compute_cpus = compute_cpus
+        self.worker_cpus = worker_cpus
+        self.compute_node = compute_node
+        self.worker_node = worker_node
+
+    def describe(self):
+        return (f"Calcul : nœud {self.compute_node}, {len(self.compute_cpus)} cœur(s) {self.compute_cpus} - "
+                f"Workers : nœud {self.worker_node}, {len(self.worker_cpus)} cœur(s) {self.worker_cpus}")
+
+    def worker_init_fn(self):
+        return functools.partial(_pin_worker, self.worker_cpus)
+
+
+def plan_placement(topology, data_workers=2, worker_cores=None):
+    """
+    Répartit les cœurs entre le calcul (threads torch) et les workers du
+    DataLoader. Avec plusieurs nœuds NUMA, le calcul prend le plus grand et
+    les workers un autre ; sur un seul nœud, les workers reçoivent les
+    derniers cœurs (worker_cores, par défaut un par worker dans la limite
+    d'un quart des cœurs). Retourne None si la séparation est impossible.
+    """
+    nodes = sorted(topology, key=lambda node: len(topology[node]), reverse=True)
+    if len(nodes) >= 2:
+        compute_node, worker_node = nodes[0], nodes[1]
+        worker_pool = topology[worker_node]
+        size = min(len(worker_pool), worker_cores or max(data_workers, 1))
+        return Placement(topology[compute_node], worker_pool[:size], compute_node, worker_node)
+    cpus = topology[nodes[0]]
+    if len(cpus) < 2:
+        return None
+    size = worker_cores or max(1, min(data_workers, len(cpus) // 4))
+    size = min(size, len(cpus) - 1)
+    return Placement(cpus[:-size], cpus[-size:], nodes[0], nodes[0])
+
+
+def _pin_worker(cpus, worker_id):
+    """worker_init_fn du DataLoader : le worker ne tourne que sur ses cœurs, sur un seul thread."""
+    import torch
+    os.sched_setaffinity(0, cpus)
+    torch.set_num_threads(1)
+
+
+def apply_compute_placement(placement, num_threads=None):
+    """
+    Restreint le processus d'entraînement (tous ses threads) à ses cœurs et
+    ajuste le nombre de threads torch (num_threads, par défaut un par cœur,
+    dans la limite des cœurs de calcul). La mémoire suit la politique du
+    premier accès : les allocations faites depuis ces cœurs restent sur leur
+    nœud NUMA.
+    """
+    import torch
+    for task in os.listdir("/proc/self/task") if os.path.isdir("/proc/self/task") else [0]:
+        try:
+            os.sched_setaffinity(int(task), placement.compute_cpus)
+        except OSError:
+            pass
+    torch.set_num_threads(min(num_threads or len(placement.compute_cpus), len(placement.compute_cpus)))
+
+
+def _measure_throughput(config, pinned, steps, warmup, results):
+    """Processus de mesure : images/s du discriminateur sur le DataLoader du projet."""
+    from controller import GANController
+
+    training_config = dict(config["training_config"])
+    # Même nombre de workers dans les deux cas : seul l'épinglage change
+    training_config["placement"] = {**(training_config.get("placement") or {}), "enabled": pinned}
+    controller = GANController(config["gen_config"], config["disc_config"], training_config)
+    controller.apply_placement()
+    trainer = controller.trainer
+    times = []
+
+    def on_step(event):
+        if event["type"] == "step":
+            times.append(time.perf_counter())
+            if len(times) >= warmup + steps:
+                trainer.stop()
+
+    trainer.add_listener(on_step)
+    trainer.current_network = "discriminateur"
+    controller.run_training()
+    measured = times[warmup:]
+    images = (len(measured) - 1) * controller.data_loader.batch_size
+    results.put(images / (measured[-1] - measured[0]) if len(measured) > 1 else 0.0)
+
+
+def compare_placement(config, steps=30, warmup=5):
+    """
+    Débit (images/s) sans puis avec placement, chacun dans un processus neuf
+    (l'affinité est héritée et ne se défait pas proprement dans un processus).
+    Retourne (non épinglé, épinglé, gain relatif). Les données synthétiques
+    n'ont pas de workers à épingler : la mesure est refusée (ValueError).
+    """
+    if config["training_config"].get("synthetic"):
+        raise ValueError("Données synthétiques : aucun worker à placer, le gain n'est pas mesurable.")
+    context = multiprocessing.get_context("spawn")
+    throughput = []
+    for pinned in (False, True):
+        results = context.Queue()
+        process = context.Process(target=_measure_throughput, args=(config, pinned, steps, warmup, results))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            raise RuntimeError(f"La mesure {'avec' if pinned else 'sans'} placement a échoué (code {process.exitcode}).")
+        throughput.append(results.get())
+    unpinned, pinned = throughput
+    return unpinned, pinned, (pinned - unpinned) / unpinned if unpinned else 0.0
+
+
+def main():
+    from headless import load_config
+
+    parser = argparse.ArgumentParser(description="Topologie, placement et gain mesuré du placement")
+    parser.add_argument("config", nargs="?", help="Configuration d'entraînement (JSON / YAML) pour la mesure")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--worker-cores", type=int, default=None)
+    parser.add_argument("--steps", type=int, default=30)
+    args = parser.parse_args()
+
+    topology = detect_topology()
+    for node, cpus in sorted(topology.items()):
+        print(f"Nœud {node} : {len(cpus)} cœur(s) {cpus}")
+    placement = plan_placement(topology, args.workers, args.worker_cores)
+    if placement is None:
+        print("Placement impossible : un seul cœur disponible.")
+        return
+    print(placement.describe())
+    if args.config:
+        config = load_config(args.config)
+        if config["training_config"].get("synthetic"):
+            print("Gain non mesuré : les données synthétiques sont générées sans workers, le placement est ignoré.")
+            return
+        placement_config = dict(config["training_config"].get("placement") or {})
+        placement_config.setdefault("data_workers", args.workers)
+        placement_config.setdefault("worker_cores", args.worker_cores)
+        config["training_config"]["placement"] = placement_config
+        unpinned, pinned, gain = compare_placement(config, args.steps)
+        print(json.dumps({"unpinned_images_per_s": unpinned, "pinned_images_per_s": pinned, "gain": gain}))
+        print(f"Sans placement : {unpinned:.1f} images/s - avec : {pinned:.1f} images/s ({gain:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
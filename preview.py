@@ -0,0 +1,83 @@
+import queue
+import threading
+import time
+import torch
+import torch.nn.functional as F
+from model_builder import get_latent_size
+from image_utils import to_uint8, make_grid, encode_png
+
+
+class SamplePreviewer:
+    def __init__(self, generator, device=None, num_samples=16, interval=5.0, nrow=4, thumb_size=64, seed=0):
+        """
+        Aperçu périodique du générateur sur un lot de bruit fixe.
+
+        Le passage avant (court, num_samples images) se fait dans le thread
+        d'entraînement, entre deux pas, pour lire des poids cohérents ; la
+        mosaïque et l'encodage PNG sont faits par un worker en arrière-plan.
+        Si le worker est encore occupé, l'aperçu est simplement sauté.
+
+        interval: délai minimal entre deux aperçus (secondes)
+        thumb_size: taille des vignettes (agrandissement au plus proche)
+        """
+        self.generator = generator
+        self.device = device if device else torch.device("cpu")
+        self.interval = interval
+        self.nrow = nrow
+        self.thumb_size = thumb_size
+        seed_generator = torch.Generator().manual_seed(seed)
+        self.latent = torch.randn(num_samples, get_latent_size(generator), generator=seed_generator).to(self.device)
+
+        self.version = 0
+        self.skipped = 0
+        self._latest = None
+        self._lock = threading.Lock()
+        self._next_capture = 0.0
+        self._closed = False
+        self._inbox = queue.Queue(maxsize=1)
+        self._worker = threading.Thread(target=self._render_loop, daemon=True)
+        self._worker.start()
+
+    def maybe_capture(self):
+        """Appelé par le Trainer à chaque pas ; ne fait rien tant que l'intervalle n'est pas écoulé."""
+        now = time.monotonic()
+        if self._closed or now < self._next_capture:
+            return
+        self._next_capture = now + self.interval
+        if self._inbox.full():
+            self.skipped += 1
+            return
+        was_training = self.generator.training
+        self.generator.eval()
+        try:
+            with torch.inference_mode():
+                samples = self.generator(self.latent).to("cpu")
+        finally:
+            self.generator.train(was_training)
+        self._inbox.put_nowait(samples)
+
+    def _render_loop(self):
+        while True:
+            samples = self._inbox.get()
+            if samples is None or self._closed:
+                return
+            images = to_uint8(samples)
+            if images.size(-1) != self.thumb_size:
+                images = F.interpolate(images.float(), size=(self.thumb_size, self.thumb_size), mode="nearest").to(torch.uint8)
+            png = encode_png(make_grid(images, nrow=self.nrow), compression_level=1)
+            with self._lock:
+                self._latest = png
+                self.version += 1
+
+    def latest(self):
+        """Retourne (version, PNG en octets) de la dernière mosaïque terminée."""
+        with self._lock:
+            return self.version, self._latest
+
+    def close(self):
+        self._closed = True
+        try:
+            self._inbox.put_nowait(None)
+        except queue.Full:
+            # Le worker trouvera _closed en prenant l'aperçu en attente
+            pass
@@ -0,0 +1,174 @@
+import contextlib
+import json
+import os
+import time
+import warnings
+import torch
+
+
+@contextlib.contextmanager
+def hooked_backward():
+    """
+    À utiliser autour d'un backward profilé. La première couche reçoit du
+    bruit sans gradient : le hook backward mesure alors le calcul des
+    gradients des poids, ce qui est le comportement voulu, et l'avertissement
+    de torch n'est masqué que pendant ce passage.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Full backward hook is firing")
+        yield
+
+
+class LayerStats:
+    def __init__(self, label):
+        self.label = label
+        self.forward_calls = 0
+        self.forward_time = 0.0
+        self.backward_calls = 0
+        self.backward_time = 0.0
+        self.output_shape = None
+        self.output_bytes = 0
+
+
+class LayerProfiler:
+    def __init__(self, model, name="model", max_events=100000):
+        """
+        Mesure par couche le temps forward/backward, le nombre d'appels et la
+        taille des sorties d'un nn.Sequential construit par NetworkBuilder.
+        Les hooks ne sont posés qu'entre attach() et detach() : hors profilage,
+        le modèle ne paie aucun coût.
+
+        max_events: nombre maximal d'événements conservés pour la trace Chrome
+        """
+        self.model = model
+        self.name = name
+        self.max_events = max_events
+        labels = getattr(model, "layer_labels", None) or [""] * len(model)
+        self.stats = [
+            LayerStats(f"{i} {type(module).__name__} <- {label}")
+            for i, (module, label) in enumerate(zip(model, labels))
+        ]
+        self.events = []
+        self._handles = []
+        self._forward_start = {}
+        self._backward_start = {}
+        self._synchronize = any(p.is_cuda for p in model.parameters())
+        self._origin = time.perf_counter()
+
+    @property
+    def attached(self):
+        return bool(self._handles)
+
+    def attach(self):
+        if self.attached:
+            return
+        for index, module in enumerate(self.model):
+            self._handles += [
+                module.register_forward_pre_hook(self._make_forward_pre_hook(index)),
+                module.register_forward_hook(self._make_forward_hook(index)),
+                module.register_full_backward_pre_hook(self._make_backward_pre_hook(index)),
+                module.register_full_backward_hook(self._make_backward_hook(index)),
+            ]
+
+    def detach(self):
+        for handle in self._handles:
+            handle.remove()
+        self._handles = []
+        self._forward_start.clear()
+        self._backward_start.clear()
+
+    def reset(self):
+        for stats in self.stats:
+            stats.__init__(stats.label)
+        self.events = []
+
+    def _now(self):
+        if self._synchronize:
+            torch.cuda.synchronize()
+        return time.perf_counter()
+
+    def _record(self, index, phase, start, end):
+        if len(self.events) < self.max_events:
+            self.events.append((index, phase, start, end))
+
+    def _make_forward_pre_hook(self, index):
+        def hook(module, inputs):
+            self._forward_start[index] = self._now()
+        return hook
+
+    def _make_forward_hook(self, index):
+        def hook(module, inputs, output):
+            end = self._now()
+            start = self._forward_start.pop(index, end)
+            stats = self.stats[index]
+            stats.forward_calls += 1
+            stats.forward_time += end - start
+            if isinstance(output, torch.Tensor):
+                stats.output_shape = tuple(output.shape)
+                stats.output_bytes = output.numel() * output.element_size()
+            self._record(index, "forward", start, end)
+        return hook
+
+    def _make_backward_pre_hook(self, index):
+        def hook(module, grad_output):
+            self._backward_start[index] = self._now()
+        return hook
+
+    def _make_backward_hook(self, index):
+        def hook(module, grad_input, grad_output):
+            end = self._now()
+            start = self._backward_start.pop(index, end)
+            stats = self.stats[index]
+            stats.backward_calls += 1
+            stats.backward_time += end - start
+            self._record(index, "backward", start, end)
+        return hook
+
+    def summary_table(self):
+        lines = [
+            f"=== {self.name} ===",
+            f"{'Couche':<60} {'Fwd (ms)':>10} {'Appels':>7} {'Bwd (ms)':>10} {'Appels':>7} {'Sortie':>18} {'Ko':>9}"
+        ]
+        for stats in self.stats:
+            shape = "x".join(str(d) for d in stats.output_shape[1:]) if stats.output_shape else "-"
+            lines.append(
+                f"{stats.label[:60]:<60} {stats.forward_time * 1000:>10.2f} {stats.forward_calls:>7} "
+                f"{stats.backward_time * 1000:>10.2f} {stats.backward_calls:>7} {shape:>18} "
+                f"{stats.output_bytes / 1024:>9.1f}"
+            )
+        total_fwd = sum(s.forward_time for s in self.stats) * 1000
+        total_bwd = sum(s.backward_time for s in self.stats) * 1000
+        lines.append(f"{'Total':<60} {total_fwd:>10.2f} {'':>7} {total_bwd:>10.2f}")
+        return "\n".join(lines)
+
+    def chrome_trace_events(self, pid=0):
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": self.name, "args": {"name": self.name}}]
+        for index, phase, start, end in self.events:
+            events.append({
+                "name": self.stats[index].label,
+                "cat": phase,
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": pid,
+                "tid": self.name,
+            })
+        return events
+
+
+def export_chrome_trace(profilers, path):
+    """Écrit une trace JSON lisible par chrome://tracing ou Perfetto."""
+    # Toutes les traces partagent la même origine temporelle
+    origin = min(p._origin for p in profilers)
+    events = []
+    for profiler in profilers:
+        shift = (profiler._origin - origin) * 1e6
+        for event in profiler.chrome_trace_events():
+            if "ts" in event:
+                event["ts"] += shift
+            events.append(event)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
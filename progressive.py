@@ -0,0 +1,182 @@
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+
+def _is_upscale(module):
+    if isinstance(module, nn.Upsample):
+        return True
+    return isinstance(module, nn.ConvTranspose2d) and max(module.stride) > 1
+
+
+def _is_downscale(module):
+    if isinstance(module, (nn.MaxPool2d, nn.AvgPool2d)):
+        return True
+    return isinstance(module, nn.Conv2d) and max(module.stride) > 1
+
+
+def _split(modules, starts):
+    """Découpe une liste de modules en blocs commençant aux indices `starts`."""
+    bounds = list(starts) + [len(modules)]
+    return [nn.Sequential(*modules[bounds[i]:bounds[i + 1]]) for i in range(len(starts))]
+
+
+@torch.no_grad()
+def _trace_shapes(segments, x):
+    """Forme de l'entrée de chaque segment, et celle de la sortie finale."""
+    shapes = []
+    for segment in segments:
+        shapes.append(tuple(x.shape[1:]))
+        x = segment(x)
+    shapes.append(tuple(x.shape[1:]))
+    return shapes
+
+
+def _lerp(old, new, alpha):
+    return new if alpha >= 1 else torch.lerp(old, new, alpha)
+
+
+class ProgressiveGenerator(nn.Module):
+    def __init__(self, network, latent_size):
+        """
+        Enveloppe un générateur construit par NetworkBuilder pour l'entraîner
+        résolution par résolution. Chaque couche d'agrandissement (upsample,
+        transposed_conv de pas > 1) ouvre un bloc ; à l'étape k, seuls les k
+        premiers blocs sont utilisés et une tête 1x1 (toRGB) produit l'image.
+        La dernière étape utilise la couche de sortie d'origine : une fois la
+        croissance terminée, le réseau est exactement celui de la configuration.
+        """
+        super().__init__()
+        self.network = network
+        modules = list(network)
+        body, self.output = modules[:-1], modules[-1]
+        if not isinstance(self.output, nn.Conv2d):
+            raise ValueError("L'entraînement progressif nécessite un générateur à sortie convolutive.")
+        starts = [i for i, module in enumerate(body) if _is_upscale(module)]
+        if not starts:
+            raise ValueError("Le générateur n'a aucune couche d'agrandissement (upsample / transposed_conv).")
+        self._stem = nn.Sequential(*body[:starts[0]])
+        self._blocks = _split(body, starts)
+
+        was_training = network.training
+        network.eval()
+        shapes = _trace_shapes([self._stem] + self._blocks, torch.zeros(2, latent_size, device=self._device()))
+        network.train(was_training)
+        # shapes[k + 1] : sortie après k blocs
+        self.stage_shapes = shapes[1:]
+
+        self.to_rgb = nn.ModuleDict()
+        for stage, shape in enumerate(self.stage_shapes[:-1]):
+            if len(shape) == 3:
+                self.to_rgb[str(stage)] = nn.Conv2d(shape[0], self.output.out_channels, kernel_size=1)
+        self.to_rgb.to(self._device())
+        self.stage = len(self._blocks)
+        self.alpha = 1.0
+
+    def _device(self):
+        return next(self.network.parameters()).device
+
+    def resolutions(self):
+        """{résolution: étape} pour les étapes qui produisent une image."""
+        return {
+            shape[-1]: stage for stage, shape in enumerate(self.stage_shapes)
+            if len(shape) == 3 and (stage == len(self._blocks) or str(stage) in self.to_rgb)
+        }
+
+    def set_stage(self, stage, alpha=1.0):
+        self.stage = stage
+        self.alpha = alpha if stage > 0 and str(stage - 1) in self.to_rgb else 1.0
+
+    def _head(self, stage):
+        return self.output if stage == len(self._blocks) else self.to_rgb[str(stage)]
+
+    def forward(self, z):
+        h = self._stem(z)
+        for block in self._blocks[:max(0, self.stage - 1)]:
+            h = block(h)
+        if self.stage == 0:
+            return self._head(0)(h)
+        out = self._head(self.stage)(self._blocks[self.stage - 1](h))
+        if self.alpha < 1:
+            # Fondu : l'image de l'étape précédente, agrandie, s'efface progressivement
+            old = F.interpolate(self._head(self.stage - 1)(h), size=out.shape[-2:], mode="nearest")
+            out = _lerp(old, out, self.alpha)
+        return out
+
+
+class ProgressiveDiscriminator(nn.Module):
+    def __init__(self, network, image_size, channels=3):
+        """
+        Enveloppe un discriminateur construit par NetworkBuilder. Chaque couche
+        de réduction (convolution de pas > 1, pooling) ouvre un bloc ; à basse
+        résolution, les premiers blocs sont sautés et une couche 1x1 (fromRGB)
+        projette l'image vers les canaux attendus par le premier bloc actif.
+        Les couches à partir du Flatten (ou la sortie) sont toujours utilisées.
+        """
+        super().__init__()
+        self.network = network
+        modules = list(network)
+        flatten = next((i for i, module in enumerate(modules) if isinstance(module, nn.Flatten)), len(modules) - 1)
+        body, self._tail = modules[:flatten], nn.Sequential(*modules[flatten:])
+        starts = [i for i, module in enumerate(body) if _is_downscale(module)]
+        if not starts:
+            raise ValueError("Le discriminateur n'a aucune couche de réduction (convolution de pas > 1, pooling).")
+        # Le premier bloc reprend les couches à pleine résolution qui précèdent la première réduction
+        starts[0] = 0
+        self._blocks = _split(body, starts)
+
+        device = next(network.parameters()).device
+        was_training = network.training
+        network.eval()
+        # entry_shapes[s] : entrée attendue quand les s premiers blocs sont sautés
+        self.entry_shapes = _trace_shapes(self._blocks, torch.zeros(2, channels, image_size, image_size, device=device))
+        network.train(was_training)
+
+        self.from_rgb = nn.ModuleDict()
+        for entry, shape in enumerate(self.entry_shapes[1:], start=1):
+            if len(shape) == 3:
+                self.from_rgb[str(entry)] = nn.Sequential(
+                    nn.Conv2d(channels, shape[0], kernel_size=1), nn.LeakyReLU(0.2)
+                )
+        self.from_rgb.to(device)
+        self.entry = 0
+        self.alpha = 1.0
+
+    def resolutions(self):
+        """{résolution: nombre de blocs sautés}."""
+        return {self.entry_shapes[0][-1]: 0, **{
+            self.entry_shapes[int(entry)][-1]: int(entry) for entry in self.from_rgb
+        }}
+
+    def set_entry(self, entry, alpha=1.0):
+        self.entry = entry
+        self.alpha = alpha if str(entry + 1) in self.from_rgb else 1.0
+
+    def _enter(self, x, entry):
+        return x if entry == 0 else self.from_rgb[str(entry)](x)
+
+    def forward(self, x):
+        entry = self.entry
+        h = self._enter(x, entry)
+        if entry < len(self._blocks):
+            h = self._blocks[entry](h)
+            if self.alpha < 1:
+                # Fondu : le chemin de l'étape précédente (image réduite) s'efface progressivement
+                reduced = F.interpolate(x, size=self.entry_shapes[entry + 1][-2:], mode="area")
+                h = _lerp(self._enter(reduced, entry + 1), h, self.alpha)
+        for block in self._blocks[entry + 1:]:
+            h = block(h)
+        return self._tail(h)
+
+
+def resolution_schedule(generator, discriminator, start_size, target_size):
+    """Résolutions communes aux deux réseaux, de start_size à target_size inclus."""
+    gen_stages = generator.resolutions()
+    disc_entries = discriminator.resolutions()
+    if target_size not in gen_stages or target_size not in disc_entries:
+        raise ValueError(f"La résolution finale {target_size} n'est pas atteinte par les deux réseaux.")
+    return [
+        (size, gen_stages[size], disc_entries[size])
+        for size in sorted(set(gen_stages) & set(disc_entries))
+        if start_size <= size <= target_size
+    ]
@@ -0,0 +1,214 @@
+import argparse
+import copy
+import json
+import os
+import time
+
+import torch
+import torch.nn as nn
+from model_builder import NetworkBuilder, get_latent_size
+
+# Types de couches dont les unités / canaux peuvent être retirés
+PRUNABLE = {"dense": nn.Linear, "convolution": nn.Conv2d, "transposed_conv": nn.ConvTranspose2d}
+_PASSTHROUGH = (nn.ReLU, nn.LeakyReLU, nn.Tanh, nn.Sigmoid, nn.Softmax, nn.Dropout,
+                nn.BatchNorm1d, nn.BatchNorm2d)
+
+
+@torch.no_grad()
+def _trace_input_shapes(network, input_shape):
+    """Forme d'entrée (sans le batch) de chaque module du réseau."""
+    was_training = network.training
+    network.eval()
+    device = next(network.parameters()).device
+    x = torch.zeros(2, *input_shape, device=device)
+    shapes = []
+    for module in network:
+        shapes.append(tuple(x.shape[1:]))
+        x = module(x)
+    network.train(was_training)
+    return shapes
+
+
+def _group_size(network, position):
+    """
+    Taille des groupes d'unités à retirer ensemble : une couche Dense suivie
+    d'un Unflatten alimente h*w positions par canal, qui partent ensemble.
+    """
+    for module in list(network)[position + 1:]:
+        if isinstance(module, nn.Unflatten):
+            return module.unflattened_size[1] * module.unflattened_size[2]
+        if not isinstance(module, _PASSTHROUGH):
+            return 1
+    return 1
+
+
+def _importance(module, criterion, batchnorm, group):
+    """Score par unité (ou groupe) : norme L1 des poids sortants, ou |gamma| de la BatchNorm qui suit."""
+    if criterion == "bn" and batchnorm is not None:
+        scores = batchnorm.weight.abs()
+    elif isinstance(module, nn.ConvTranspose2d):
+        scores = module.weight.abs().sum(dim=(0, 2, 3))
+    else:
+        scores = module.weight.abs().flatten(1).sum(dim=1)
+    return scores.reshape(-1, group).sum(dim=1)
+
+
+def _layer_type(layer_config):
+    return {k.lower(): v for k, v in layer_config.items()}.get("layer_type", "dense").lower()
+
+
+def _set_units(layer_config, units):
+    key = next((k for k in layer_config if k.lower() == "units"), "units")
+    layer_config[key] = units
+
+
+def prune_network(config, network, amount=0.5, criterion="l1", layers=None,
+                  default_input_size=100, default_output_size=64):
+    """
+    Élagage structuré d'un réseau construit par NetworkBuilder.
+
+    Pour chaque couche Dense / Convolution / transposed_conv, les unités ou
+    canaux les moins importants sont retirés ; la configuration est réécrite
+    (units réduit) et le réseau reconstruit, puis les poids conservés sont
+    recopiés, couches suivantes comprises (entrées des Linear / Conv,
+    BatchNorm, regroupements Flatten / Unflatten). Le résultat est un réseau
+    dense plus petit, pas un masque.
+
+    config: gen_config / disc_config du réseau
+    amount: part des unités retirées par couche (0.5 = la moitié)
+    criterion: "l1" (norme des poids) ou "bn" (|gamma| de la BatchNorm qui suit, l1 à défaut)
+    layers: {indice de couche: amount} pour limiter ou ajuster l'élagage par couche
+    Retourne (nouvelle configuration, nouveau réseau).
+    """
+    if criterion not in ("l1", "bn"):
+        raise ValueError(f"Critère d'importance inconnu : {criterion} (l1 ou bn)")
+    modules = list(network)
+    indices = network.layer_indices
+    new_config = copy.deepcopy(config)
+    layer_configs = new_config.get("layers", [])
+
+    # Unités conservées (indices au niveau des features) par position de module
+    keep = {}
+    for index, layer_config in enumerate(layer_configs):
+        layer_type = _layer_type(layer_config)
+        layer_amount = (layers or {}).get(index, amount if layers is None else 0)
+        if layer_type not in PRUNABLE or layer_amount <= 0:
+            continue
+        positions = [p for p, i in enumerate(indices) if i == index]
+        position = next(p for p in positions if isinstance(modules[p], PRUNABLE[layer_type]))
+        # BatchNorm de la couche elle-même (transposed_conv) ou de l'entrée "batchnorm" suivante
+        batchnorm = next((modules[p] for p in positions if isinstance(modules[p], nn.BatchNorm2d)), None)
+        if batchnorm is None and index + 1 < len(layer_configs) and _layer_type(layer_configs[index + 1]) == "batchnorm":
+            batchnorm = next(module for module, i in zip(modules, indices) if i == index + 1)
+        group = _group_size(network, position)
+        scores = _importance(modules[position], criterion, batchnorm, group)
+        kept = max(1, round(scores.numel() * (1 - layer_amount)))
+        groups = scores.topk(kept).indices.sort().values
+        keep[position] = (groups[:, None] * group + torch.arange(group, device=groups.device)).flatten()
+        _set_units(layer_config, kept * group)
+
+    builder = NetworkBuilder.from_config(new_config, default_input_size, default_output_size)
+    pruned = builder.build_network().to(next(network.parameters()).device)
+    shapes = _trace_input_shapes(network, builder._get_initial_shape())
+    _copy_weights(modules, list(pruned), keep, shapes)
+    pruned.train(network.training)
+    return new_config, pruned
+
+
+@torch.no_grad()
+def _copy_weights(old_modules, new_modules, keep, shapes):
+    keep_in = None
+    for position, (old, new) in enumerate(zip(old_modules, new_modules)):
+        out = keep.get(position)
+        if isinstance(old, (nn.Linear, nn.Conv2d)):
+            weight = old.weight if keep_in is None else old.weight[:, keep_in]
+            new.weight.copy_(weight if out is None else weight[out])
+            if old.bias is not None:
+                new.bias.copy_(old.bias if out is None else old.bias[out])
+            keep_in = out
+        elif isinstance(old, nn.ConvTranspose2d):
+            weight = old.weight if keep_in is None else old.weight[keep_in]
+            new.weight.copy_(weight if out is None else weight[:, out])
+            if old.bias is not None:
+                new.bias.copy_(old.bias if out is None else old.bias[out])
+            keep_in = out
+        elif isinstance(old, (nn.BatchNorm1d, nn.BatchNorm2d)):
+            for name in ("weight", "bias", "running_mean", "running_var"):
+                tensor = getattr(old, name)
+                getattr(new, name).copy_(tensor if keep_in is None else tensor[keep_in])
+            new.num_batches_tracked.copy_(old.num_batches_tracked)
+        elif isinstance(old, nn.Flatten) and keep_in is not None:
+            # Canaux conservés -> toutes leurs positions spatiales
+            area = shapes[position][1] * shapes[position][2]
+            keep_in = (keep_in[:, None] * area + torch.arange(area, device=keep_in.device)).flatten()
+        elif isinstance(old, nn.Unflatten) and keep_in is not None:
+            area = old.unflattened_size[1] * old.unflattened_size[2]
+            keep_in = keep_in.reshape(-1, area)[:, 0] // area
+        else:
+            new.load_state_dict(old.state_dict())
+
+
+def parameter_count(network):
+    return sum(param.numel() for param in network.parameters())
+
+
+def prune_generator(controller, amount=0.5, criterion="l1", layers=None, fine_tune_epochs=0, callback=None):
+    """
+    Élague le générateur d'un GANController en place, puis le réentraîne
+    éventuellement quelques epochs via le Trainer (face au discriminateur
+    déjà entraîné) pour récupérer la qualité.
+    """
+    before = parameter_count(controller.generator)
+    gen_config, generator = prune_network(controller.gen_config, controller.generator, amount, criterion, layers)
+    trainer = controller.trainer
+    controller.gen_config = gen_config
+    controller.generator = generator
+    trainer.replace_generator(generator, controller.gen_train_params.get("learning_rate", 0.001))
+    if callback:
+        callback(f"[Élagage] Générateur : {before} -> {parameter_count(generator)} paramètres")
+    if fine_tune_epochs:
+        trainer.train_generator(fine_tune_epochs, controller.gen_train_params.get("batch_size", 32), callback)
+    return gen_config
+
+
+def _latency_ms(generator, batch_size, repeat=20):
+    noise = torch.randn(batch_size, get_latent_size(generator), device=next(generator.parameters()).device)
+    generator.eval()
+    with torch.inference_mode():
+        generator(noise)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            generator(noise)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    from flat_checkpoint import save_weights
+    from serving import load_generator
+
+    parser = argparse.ArgumentParser(description="Élagage structuré d'un générateur entraîné")
+    parser.add_argument("--config", required=True, help="Fichier JSON contenant gen_config")
+    parser.add_argument("--weights", required=True, help="Poids du générateur (Trainer.save_model)")
+    parser.add_argument("--amount", type=float, default=0.5, help="Part des unités retirées par couche")
+    parser.add_argument("--criterion", choices=["l1", "bn"], default="l1")
+    parser.add_argument("--output-config", required=True)
+    parser.add_argument("--output-weights", required=True, help="Extension .flat pour le format plat")
+    parser.add_argument("--batch-size", type=int, default=64, help="Batch de la mesure de latence")
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        gen_config = json.load(f)
+    generator = load_generator(gen_config, args.weights)
+    pruned_config, pruned = prune_network(gen_config, generator, args.amount, args.criterion)
+    with open(args.output_config, "w") as f:
+        json.dump(pruned_config, f, indent=2, ensure_ascii=False)
+    save_weights(pruned.state_dict(), args.output_weights)
+
+    print(f"Paramètres : {parameter_count(generator)} -> {parameter_count(pruned)}")
+    print(f"Fichier : {os.path.getsize(args.weights) / 1024:.0f} Ko -> {os.path.getsize(args.output_weights) / 1024:.0f} Ko")
+    print(f"Latence (batch {args.batch_size}) : {_latency_ms(generator, args.batch_size):.1f} ms -> "
+          f"{_latency_ms(pruned, args.batch_size):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import torch
+
+DTYPES = {"uint8": torch.uint8, "float16": torch.float16}
+
+
+class ReplayBuffer:
+    def __init__(self, capacity=4096, mix=0.5, dtype="float16", device=None, seed=0):
+        """
+        Tampon circulaire d'échantillons générés, pour les pas du discriminateur.
+
+        capacity: nombre d'échantillons conservés (stockage alloué une seule fois)
+        mix: part des batchs de faux servis entièrement par le tampon, sans
+            passage du générateur, dans [0, 1[ (0 = toujours neufs) : les
+            autres batchs sont générés et renouvellent le tampon
+        dtype: "float16", ou "uint8" pour des sorties dans [-1, 1] (tanh) :
+            4 fois moins de mémoire que float32, au prix d'une quantification
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Type de stockage non supporté : {dtype} (uint8 ou float16)")
+        if not 0 <= mix < 1:
+            raise ValueError("mix doit être compris entre 0 (inclus) et 1 (exclu).")
+        self.capacity = capacity
+        self.mix = mix
+        self.dtype = DTYPES[dtype]
+        self.device = device if device else torch.device("cpu")
+        self.generator = torch.Generator(device=self.device).manual_seed(seed)
+        self.storage = None
+        self.size = 0
+        self._next = 0
+        self.fresh = 0
+        self.replayed = 0
+        self.generator_passes = 0
+        self.skipped_passes = 0
+        # Part de batch rejoué accumulée (répartit les batchs rejoués régulièrement)
+        self._credit = 0.0
+
+    def _encode(self, samples):
+        if self.dtype == torch.uint8:
+            return samples.mul(127.5).add_(127.5).clamp_(0, 255).round_().to(torch.uint8)
+        return samples.to(torch.float16)
+
+    def _decode(self, stored):
+        if self.dtype == torch.uint8:
+            return stored.float().sub_(127.5).div_(127.5)
+        return stored.float()
+
+    def add(self, samples):
+        """Ajoute un batch (écrase les plus anciens une fois le tampon plein)."""
+        samples = samples.detach()
+        if self.storage is None:
+            self.storage = torch.empty((self.capacity, *samples.shape[1:]), dtype=self.dtype, device=self.device)
+        samples = samples[-self.capacity:]
+        n = samples.size(0)
+        end = self._next + n
+        encoded = self._encode(samples.to(self.device))
+        if end <= self.capacity:
+            self.storage[self._next:end] = encoded
+        else:
+            split = self.capacity - self._next
+            self.storage[self._next:] = encoded[:split]
+            self.storage[:end - self.capacity] = encoded[split:]
+        self._next = end % self.capacity
+        self.size = min(self.capacity, self.size + n)
+
+    def sample(self, n):
+        indices = torch.randint(0, self.size, (n,), generator=self.generator, device=self.device)
+        return self._decode(self.storage[indices])
+
+    def fakes(self, batch_size, generate):
+        """
+        Batch de faux : une fraction `mix` des batchs est tirée entièrement du
+        tampon, ce qui évite le passage du générateur ; les autres sont
+        générés (generate(n) -> tenseur) et ajoutés au tampon. À utiliser
+        pendant que le générateur est figé (phase du discriminateur). Tant que
+        le tampon ne contient pas un batch entier, tout est généré.
+        """
+        self._credit += self.mix
+        if self._credit >= 1 and self.size >= batch_size:
+            self._credit -= 1
+            self.replayed += batch_size
+            self.skipped_passes += 1
+            return self.sample(batch_size)
+        self._credit = min(self._credit, 1.0)
+        new = generate(batch_size).detach()
+        self.add(new)
+        self.fresh += batch_size
+        self.generator_passes += 1
+        return new
+
+    def hit_rate(self):
+        total = self.fresh + self.replayed
+        return self.replayed / total if total else 0.0
+
+    def memory_bytes(self):
+        return 0 if self.storage is None else self.storage.numel() * self.storage.element_size()
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "capacity": self.capacity,
+            "hit_rate": self.hit_rate(),
+            "fresh": self.fresh,
+            "replayed": self.replayed,
+            "generator_passes": self.generator_passes,
+            "skipped_passes": self.skipped_passes,
+            "memory_mb": self.memory_bytes() / (1024 * 1024)
+        }
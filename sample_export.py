@@ -0,0 +1,153 @@
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import torch
+from model_builder import get_latent_size
+from image_utils import to_uint8, make_grid, encode_png
+
+
+def _encode_chunk(data, shape, start_index, grid, nrow, compression_level, directory, prefix):
+    """
+    Exécuté dans un processus du pool : encode un bloc d'images uint8 en PNG.
+    Écrit directement dans `directory` si fourni, sinon retourne les octets.
+    """
+    images = torch.frombuffer(bytearray(data), dtype=torch.uint8).reshape(shape)
+    if grid:
+        groups = [images[i:i + grid] for i in range(0, len(images), grid)]
+        encoded = [make_grid(group, nrow=nrow) for group in groups]
+        first_index = start_index // grid
+    else:
+        encoded = list(images)
+        first_index = start_index
+
+    results = []
+    for offset, image in enumerate(encoded):
+        name = f"{prefix}_{first_index + offset:07d}.png"
+        png = encode_png(image, compression_level)
+        if directory:
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(png)
+            results.append((name, None))
+        else:
+            results.append((name, png))
+    return results
+
+
+class _ArchiveWriter:
+    def __init__(self, path):
+        self.path = path
+        if path.endswith(".zip"):
+            # Les PNG sont déjà compressés : stockage sans recompression
+            self.archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED)
+        else:
+            self.archive = tarfile.open(path, "w")
+
+    def add(self, name, data):
+        if isinstance(self.archive, zipfile.ZipFile):
+            self.archive.writestr(name, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = time.time()
+            self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.archive.close()
+
+
+@torch.inference_mode()
+def export_samples(generator, num_samples, output, batch_size=256, grid=None, nrow=8,
+                   workers=None, device=None, compression_level=6, prefix="sample"):
+    """
+    Génère num_samples images par batchs et les encode en PNG dans un pool de processus.
+
+    output: dossier de destination, ou archive (.zip / .tar) pour un fichier unique
+    grid: si défini, regroupe les images par `grid` en mosaïques (nrow par ligne)
+    workers: nombre de processus d'encodage (défaut : nombre de cœurs)
+    Retourne le nombre de fichiers PNG écrits.
+    """
+    if grid and batch_size % grid != 0:
+        # Une mosaïque ne doit jamais être coupée entre deux batchs
+        batch_size = max(grid, batch_size - batch_size % grid)
+    device = device if device else next(generator.parameters()).device
+    latent_size = get_latent_size(generator)
+    workers = workers or os.cpu_count() or 1
+
+    archive = None
+    directory = None
+    if output.endswith((".zip", ".tar")):
+        archive = _ArchiveWriter(output)
+    else:
+        directory = output
+        os.makedirs(directory, exist_ok=True)
+
+    was_training = generator.training
+    generator.eval()
+    written = 0
+    pending = set()
+
+    def drain(futures):
+        nonlocal written
+        for future in futures:
+            for name, png in future.result():
+                if archive is not None:
+                    archive.add(name, png)
+                written += 1
+
+    context = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for start in range(0, num_samples, batch_size):
+                n = min(batch_size, num_samples - start)
+                noise = torch.randn(n, latent_size, device=device)
+                images = to_uint8(generator(noise))
+                pending.add(pool.submit(
+                    _encode_chunk, images.numpy().tobytes(), tuple(images.shape), start,
+                    grid, nrow, compression_level, directory, prefix
+                ))
+                # Contre-pression : la génération n'avance pas plus vite que l'encodage
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    drain(done)
+            drain(pending)
+    finally:
+        generator.train(was_training)
+        if archive is not None:
+            archive.close()
+    return written
+
+
+def main():
+    from serving import load_generator
+
+    parser = argparse.ArgumentParser(description="Export massif d'échantillons PNG depuis un générateur entraîné")
+    parser.add_argument("--config", required=True, help="Fichier JSON contenant gen_config")
+    parser.add_argument("--weights", required=True, help="Poids du générateur (Trainer.save_model)")
+    parser.add_argument("--num-samples", type=int, required=True)
+    parser.add_argument("--output", required=True, help="Dossier, ou archive .zip/.tar")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--grid", type=int, default=None, help="Nombre d'images par mosaïque")
+    parser.add_argument("--nrow", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        gen_config = json.load(f)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    generator = load_generator(gen_config, args.weights, device)
+    start = time.perf_counter()
+    written = export_samples(generator, args.num_samples, args.output, args.batch_size,
+                             args.grid, args.nrow, args.workers, device)
+    elapsed = time.perf_counter() - start
+    print(f"{written} fichiers écrits en {elapsed:.1f} s ({args.num_samples / elapsed:.0f} échantillons/s)")
+
+
+if __name__ == "__main__":
+    main()
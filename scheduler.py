@@ -0,0 +1,311 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+
+from placement import allowed_cpus
+
+# Codes de sortie des processus d'entraînement
+EXIT_DONE = 0
+EXIT_FAILED = 1
+EXIT_PREEMPTED = 3
+
+
+def total_memory_mb():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return 8192
+
+
+class ScheduledJob:
+    def __init__(self, job_id, gen_config, disc_config, training_config, phases=None,
+                 priority=0, cores=1, memory_mb=1024):
+        """
+        priority: les valeurs hautes passent en premier et peuvent préempter les plus basses
+        cores: threads torch réservés pour la tâche
+        memory_mb: mémoire réservée ; sert aussi de plafond au suivi mémoire du Trainer
+        """
+        self.id = job_id
+        self.gen_config = gen_config
+        self.disc_config = disc_config
+        self.training_config = training_config
+        self.phases = phases or [training_config.get("initial_network", "générateur")]
+        self.priority = priority
+        self.cores = cores
+        self.memory_mb = memory_mb
+        self.status = "en attente"
+        self.checkpoint = None
+        self.preemptions = 0
+        self.error = None
+        self.submitted = time.time()
+        self.process = None
+        self.preempt_event = None
+        # Cœurs attribués à la tâche quand un placement est configuré
+        self.cpus = None
+
+
+def _run_job(job_id, gen_config, disc_config, training_config, phases, cores, cpus, checkpoint_path,
+             resume, preempt_event, events):
+    """Point d'entrée du processus d'entraînement d'une tâche."""
+    import torch
+    from controller import GANController
+
+    if cpus:
+        # Avant le contrôleur : le placement est planifié dans la tranche de la tâche
+        os.sched_setaffinity(0, cpus)
+    torch.set_num_threads(cores)
+    try:
+        if resume:
+            controller = GANController.from_checkpoint(checkpoint_path)
+        else:
+            controller = GANController(gen_config, disc_config, training_config)
+        if cpus:
+            controller.apply_placement(cores)
+        else:
+            # Sans tranche dédiée, les workers ne sont pas épinglés non plus
+            controller.data_loader.worker_init_fn = None
+        controller.trainer.preempt_event = preempt_event
+        controller.add_listener(lambda event: events.put((job_id, event)))
+        completed = controller.run_phases(phases, lambda msg: events.put((job_id, {"type": "message", "message": msg})))
+        if not completed:
+            # Arrêt à une frontière de pas : l'état est sauvegardé pour la reprise
+            controller.save_checkpoint(checkpoint_path)
+            sys.exit(EXIT_PREEMPTED)
+    except Exception as e:
+        events.put((job_id, {"type": "error", "error": f"{type(e).__name__}: {e}"}))
+        sys.exit(EXIT_FAILED)
+    sys.exit(EXIT_DONE)
+
+
+class TrainingScheduler:
+    def __init__(self, total_cores=None, total_memory=None, checkpoint_dir="checkpoints",
+                 poll_interval=0.5, on_event=None):
+        """
+        Ordonnanceur local de tâches d'entraînement : chaque tâche tourne dans son
+        propre processus avec ses cœurs réservés. Lorsqu'une tâche prioritaire ne
+        trouve pas de place, des tâches de priorité inférieure sont préemptées
+        (sauvegarde au prochain pas), puis remises en file et reprises plus tard
+        depuis leur checkpoint.
+
+        total_cores / total_memory: capacité de la machine (Mo), détectée par défaut
+        on_event: callback(job_id, event) pour la progression des tâches
+        """
+        self.total_cores = total_cores or os.cpu_count() or 1
+        self.total_memory = total_memory or total_memory_mb()
+        self.checkpoint_dir = checkpoint_dir
+        self.poll_interval = poll_interval
+        self.on_event = on_event
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._free_cpus = allowed_cpus()
+        self._context = multiprocessing.get_context("spawn")
+        self._events = self._context.Queue()
+        self._thread = None
+        self._stop = threading.Event()
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def submit(self, gen_config, disc_config, training_config, phases=None, priority=0, cores=1, memory_mb=1024):
+        if cores > self.total_cores or memory_mb > self.total_memory:
+            raise ValueError("La tâche demande plus de ressources que la machine n'en possède.")
+        training_config = dict(training_config)
+        training_config.setdefault("memory", {"limit_mb": memory_mb})
+        with self._lock:
+            job = ScheduledJob(next(self._ids), gen_config, disc_config, training_config, phases,
+                               priority, cores, memory_mb)
+            job.checkpoint = os.path.join(self.checkpoint_dir, f"job_{job.id}.ckpt")
+            self.jobs[job.id] = job
+        return job.id
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self.jobs[job_id]
+            if job.process is not None and job.process.is_alive():
+                job.process.terminate()
+            self._release_cpus(job)
+            job.status = "annulé"
+
+    def status(self):
+        with self._lock:
+            return {job.id: (job.status, job.priority, job.preemptions) for job in self.jobs.values()}
+
+    # ------------------------------------------------------------------
+    def _used(self):
+        running = [j for j in self.jobs.values() if j.status in ("en cours", "préemption")]
+        return sum(j.cores for j in running), sum(j.memory_mb for j in running)
+
+    def _fits(self, job, cores_used, memory_used):
+        return cores_used + job.cores <= self.total_cores and memory_used + job.memory_mb <= self.total_memory
+
+    def _take_cpus(self, job):
+        """
+        Tranche de cœurs propre à la tâche si un placement est configuré : les
+        tâches voisines ne s'épinglent jamais sur les mêmes cœurs. None si le
+        placement n'est pas demandé ou s'il ne reste pas assez de cœurs libres
+        (capacité déclarée supérieure aux cœurs réels).
+        """
+        if not job.training_config.get("placement") or len(self._free_cpus) < job.cores:
+            return None
+        cpus, self._free_cpus = self._free_cpus[:job.cores], self._free_cpus[job.cores:]
+        return cpus
+
+    def _release_cpus(self, job):
+        if job.cpus:
+            self._free_cpus = sorted(self._free_cpus + job.cpus)
+            job.cpus = None
+
+    def _launch(self, job):
+        resume = os.path.exists(job.checkpoint) and job.preemptions > 0
+        job.preempt_event = self._context.Event()
+        job.cpus = self._take_cpus(job)
+        job.process = self._context.Process(
+            target=_run_job,
+            args=(job.id, job.gen_config, job.disc_config, job.training_config, job.phases, job.cores,
+                  job.cpus, job.checkpoint, resume, job.preempt_event, self._events)
+        )
+        job.status = "en cours"
+        job.process.start()
+
+    def _preempt_for(self, job, cores_used, memory_used):
+        """
+        Préempte les tâches de plus basse priorité si cela libère assez de place
+        pour `job`. Les tâches déjà en cours de préemption comptent comme libérées :
+        tant qu'elles suffisent, aucune autre n'est interrompue.
+        """
+        stopping = [j for j in self.jobs.values() if j.status == "préemption"]
+        freed_cores = sum(j.cores for j in stopping)
+        freed_memory = sum(j.memory_mb for j in stopping)
+        victims = sorted(
+            (j for j in self.jobs.values() if j.status == "en cours" and j.priority < job.priority),
+            key=lambda j: (j.priority, -j.submitted)
+        )
+        chosen = []
+        for victim in victims:
+            if self._fits(job, cores_used - freed_cores, memory_used - freed_memory):
+                break
+            chosen.append(victim)
+            freed_cores += victim.cores
+            freed_memory += victim.memory_mb
+        if not self._fits(job, cores_used - freed_cores, memory_used - freed_memory):
+            return False
+        for victim in chosen:
+            victim.status = "préemption"
+            victim.preempt_event.set()
+        return bool(chosen or stopping)
+
+    def _reap(self):
+        for job in self.jobs.values():
+            if job.process is None or job.process.is_alive() or job.status not in ("en cours", "préemption"):
+                continue
+            code = job.process.exitcode
+            job.process = None
+            self._release_cpus(job)
+            if code == EXIT_PREEMPTED:
+                job.preemptions += 1
+                job.status = "en attente"
+            elif code == EXIT_DONE:
+                job.status = "terminé"
+            else:
+                job.status = "échec"
+
+    def _schedule(self):
+        with self._lock:
+            self._reap()
+            cores_used, memory_used = self._used()
+            pending = sorted(
+                (j for j in self.jobs.values() if j.status == "en attente"),
+                key=lambda j: (-j.priority, j.submitted)
+            )
+            for job in pending:
+                if self._fits(job, cores_used, memory_used):
+                    self._launch(job)
+                    cores_used += job.cores
+                    memory_used += job.memory_mb
+                elif self._preempt_for(job, cores_used, memory_used):
+                    # La place se libère quand les tâches préemptées ont sauvegardé
+                    break
+                else:
+                    # Les tâches moins prioritaires peuvent combler les cœurs restants
+                    continue
+
+    def _drain_events(self):
+        while True:
+            try:
+                job_id, event = self._events.get_nowait()
+            except queue.Empty:
+                return
+            if event.get("type") == "error":
+                self.jobs[job_id].error = event["error"]
+            if self.on_event:
+                self.on_event(job_id, event)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._drain_events()
+            self._schedule()
+            if self.idle():
+                if self._stop.wait(self.poll_interval):
+                    break
+            else:
+                time.sleep(self.poll_interval)
+        self._drain_events()
+
+    def idle(self):
+        with self._lock:
+            return all(j.status in ("terminé", "échec", "annulé") for j in self.jobs.values())
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def run_until_complete(self):
+        self.start()
+        while not self.idle():
+            time.sleep(self.poll_interval)
+        self.stop()
+
+
+def main():
+    from headless import load_config
+
+    parser = argparse.ArgumentParser(description="Ordonnanceur local de tâches d'entraînement")
+    parser.add_argument("jobs", help="Fichier JSON : liste de {config, priority, cores, memory_mb}")
+    parser.add_argument("--cores", type=int, default=None, help="Cœurs disponibles (défaut : tous)")
+    parser.add_argument("--memory-mb", type=int, default=None)
+    parser.add_argument("--checkpoint-dir", default="checkpoints")
+    args = parser.parse_args()
+
+    def print_event(job_id, event):
+        print(json.dumps({"job": job_id, **event}, ensure_ascii=False, default=str), flush=True)
+
+    scheduler = TrainingScheduler(args.cores, args.memory_mb, args.checkpoint_dir, on_event=print_event)
+    with open(args.jobs) as f:
+        for entry in json.load(f):
+            config = load_config(entry["config"])
+            scheduler.submit(
+                config["gen_config"], config["disc_config"], config["training_config"],
+                phases=config.get("phases"),
+                priority=entry.get("priority", 0),
+                cores=entry.get("cores", 1),
+                memory_mb=entry.get("memory_mb", 1024)
+            )
+    scheduler.run_until_complete()
+    failed = [job_id for job_id, (status, _, _) in scheduler.status().items() if status == "échec"]
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import http.client
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingUnixStreamServer
+from urllib.parse import urlparse, parse_qs
+
+import torch
+from model_builder import NetworkBuilder, get_latent_size
+from image_utils import as_images, to_uint8, make_grid, encode_png
+from flat_checkpoint import load_into
+
+
+def load_generator(gen_config, weights_path, device=None):
+    """
+    Reconstruit le générateur depuis sa configuration et charge ses poids.
+    Un checkpoint plat est projeté en mémoire : les processus qui servent le
+    même modèle partagent ses pages au lieu d'en garder chacun une copie.
+    """
+    device = device if device else torch.device("cpu")
+    generator = NetworkBuilder.from_config(gen_config, 100, 64).build_network()
+    load_into(generator, weights_path, device, assign=True)
+    generator.to(device)
+    generator.eval()
+    return generator
+
+
+class MicroBatcher:
+    def __init__(self, generator, device=None, max_batch_size=64, max_wait_ms=5):
+        """
+        Regroupe les requêtes concurrentes en micro-batchs : la première requête
+        ouvre une fenêtre de max_wait_ms pendant laquelle les suivantes sont
+        ajoutées au même passage avant du générateur (jusqu'à max_batch_size).
+        """
+        self.generator = generator
+        self.device = device if device else torch.device("cpu")
+        self.latent_size = get_latent_size(generator)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.requests = queue.Queue()
+        self.batches_run = 0
+        self.samples_served = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, num_samples):
+        """Retourne un Future résolu avec un tenseur CPU (num_samples, C, H, W)."""
+        future = Future()
+        self.requests.put((num_samples, future))
+        return future
+
+    def sample(self, num_samples):
+        return self.submit(num_samples).result()
+
+    def close(self):
+        self._running = False
+        self.requests.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        first = self.requests.get()
+        if first is None:
+            return []
+        pending = [first]
+        total = first[0]
+        deadline = time.perf_counter() + self.max_wait
+        while total < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = self.requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                self._running = False
+                break
+            pending.append(item)
+            total += item[0]
+        return pending
+
+    def _loop(self):
+        while self._running:
+            pending = self._collect()
+            if not pending:
+                continue
+            sizes = [n for n, _ in pending]
+            try:
+                with torch.inference_mode():
+                    noise = torch.randn(sum(sizes), self.latent_size, device=self.device)
+                    # Les requêtes plus grandes que max_batch_size sont découpées
+                    outputs = [self.generator(chunk) for chunk in noise.split(self.max_batch_size)]
+                    images = as_images(torch.cat(outputs)).cpu()
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            self.batches_run += 1
+            self.samples_served += len(images)
+            for (_, future), chunk in zip(pending, images.split(sizes)):
+                future.set_result(chunk)
+
+
+class SampleRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /sample?n=4&format=png  -> grille PNG des n échantillons
+    GET /sample?n=4&format=raw  -> tenseur float32 brut (en-têtes X-Shape, X-Dtype)
+    GET /health                 -> statistiques du batcher (JSON)
+    """
+    batcher = None
+    max_samples = 256
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send(200, "application/json", json.dumps({
+                "batches": self.batcher.batches_run,
+                "samples": self.batcher.samples_served
+            }).encode())
+            return
+        if url.path != "/sample":
+            self._send(404, "text/plain", b"not found")
+            return
+
+        params = parse_qs(url.query)
+        try:
+            n = int(params.get("n", ["1"])[0])
+        except ValueError:
+            n = 0
+        if not 1 <= n <= self.max_samples:
+            self._send(400, "text/plain", f"n doit être compris entre 1 et {self.max_samples}".encode())
+            return
+        fmt = params.get("format", ["png"])[0]
+        if fmt not in ("png", "raw"):
+            self._send(400, "text/plain", b"format inconnu (png ou raw)")
+            return
+        try:
+            nrow = int(params.get("nrow", ["8"])[0])
+        except ValueError:
+            nrow = 0
+        if nrow < 1:
+            self._send(400, "text/plain", "nrow doit être un entier positif".encode())
+            return
+
+        images = self.batcher.sample(n)
+        if fmt == "raw":
+            body = images.to(torch.float32).contiguous().numpy().tobytes()
+            self._send(200, "application/octet-stream", body, {
+                "X-Shape": ",".join(str(d) for d in images.shape),
+                "X-Dtype": "float32"
+            })
+        else:
+            self._send(200, "image/png", encode_png(make_grid(to_uint8(images), nrow=nrow)))
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Sur socket Unix, client_address n'est pas un tuple (hôte, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TCPHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class UnixHTTPServer(ThreadingUnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def create_server(batcher, host="127.0.0.1", port=8000, unix_socket=None):
+    handler = type("Handler", (SampleRequestHandler,), {"batcher": batcher})
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        return UnixHTTPServer(unix_socket, handler)
+    return TCPHTTPServer((host, port), handler)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """Client HTTP sur socket Unix (utilisé par le benchmark de charge)."""
+    def __init__(self, socket_path, timeout=30):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service local d'échantillons pour un générateur entraîné")
+    parser.add_argument("--config", required=True, help="Fichier JSON contenant gen_config")
+    parser.add_argument("--weights", required=True, help="Poids du générateur (Trainer.save_model)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--socket", default=None, help="Chemin d'un socket Unix (remplace host/port)")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        gen_config = json.load(f)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    generator = load_generator(gen_config, args.weights, device)
+    batcher = MicroBatcher(generator, device, args.max_batch_size, args.max_wait_ms)
+    # Préchauffage : premier passage avant et import de l'encodeur PNG
+    encode_png(make_grid(to_uint8(batcher.sample(1))))
+    server = create_server(batcher, args.host, args.port, args.socket)
+    print(f"Service prêt sur {args.socket or f'http://{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+
+
+if __name__ == "__main__":
+    main()
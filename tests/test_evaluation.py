@@ -0,0 +1,47 @@
+import pytest
+import torch
+
+from evaluation import RunningStatistics, frechet_distance
+
+
+def test_running_statistics_merge_matches_full_batch():
+    torch.manual_seed(0)
+    features = torch.randn(103, 5, dtype=torch.float64)
+    stats = RunningStatistics()
+    for chunk in features.split(17):
+        stats.update(chunk)
+    assert stats.count == 103
+    assert torch.allclose(stats.mean, features.mean(dim=0))
+    assert torch.allclose(stats.covariance(), torch.cov(features.T))
+
+
+def test_running_statistics_state_dict_round_trip():
+    stats = RunningStatistics()
+    stats.update(torch.arange(12.0).reshape(4, 3))
+    restored = RunningStatistics.from_state_dict(stats.state_dict())
+    assert restored.count == 4
+    assert torch.equal(restored.covariance(), stats.covariance())
+
+
+def test_covariance_needs_two_samples():
+    stats = RunningStatistics()
+    stats.update(torch.ones(1, 3))
+    with pytest.raises(ValueError):
+        stats.covariance()
+
+
+def test_frechet_distance_identical_gaussians_is_zero():
+    torch.manual_seed(0)
+    a = torch.randn(4, 4, dtype=torch.float64)
+    sigma = a @ a.T + torch.eye(4, dtype=torch.float64)
+    mu = torch.randn(4, dtype=torch.float64)
+    assert frechet_distance(mu, sigma, mu, sigma) == pytest.approx(0.0, abs=1e-8)
+
+
+def test_frechet_distance_closed_form():
+    # Covariances diagonales : ||mu1 - mu2||² + somme (sqrt(s1) - sqrt(s2))²
+    mu1, mu2 = torch.zeros(3), torch.tensor([1.0, 2.0, 0.0])
+    sigma1 = torch.diag(torch.tensor([1.0, 4.0, 9.0]))
+    sigma2 = torch.diag(torch.tensor([4.0, 4.0, 1.0]))
+    expected = 5.0 + (1 - 2) ** 2 + 0 + (3 - 1) ** 2
+    assert frechet_distance(mu1, sigma1, mu2, sigma2) == pytest.approx(expected)
@@ -0,0 +1,45 @@
+import torch
+from torch import nn
+
+from flat_checkpoint import FlatCheckpoint, is_flat_checkpoint, load_into, save_flat
+
+
+def _state_dict():
+    return {
+        "weight": torch.arange(12, dtype=torch.float32).reshape(3, 4),
+        "half": torch.tensor([1.5, -2.0], dtype=torch.float16),
+        "steps": torch.tensor(7, dtype=torch.int64),
+        "empty": torch.empty(0, 5),
+    }
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "weights.flat")
+    state = _state_dict()
+    save_flat(state, path, metadata={"epoch": 3})
+    assert is_flat_checkpoint(path)
+    checkpoint = FlatCheckpoint(path)
+    assert checkpoint.metadata == {"epoch": 3}
+    assert list(checkpoint) == list(state)
+    for name, tensor in state.items():
+        assert checkpoint[name].dtype == tensor.dtype
+        assert torch.equal(checkpoint[name], tensor)
+    assert checkpoint.nbytes() == sum(t.numel() * t.element_size() for t in state.values())
+
+
+def test_writes_stay_private(tmp_path):
+    path = str(tmp_path / "weights.flat")
+    save_flat(_state_dict(), path)
+    FlatCheckpoint(path)["weight"].zero_()
+    assert torch.equal(FlatCheckpoint(path)["weight"], _state_dict()["weight"])
+
+
+def test_load_into_module(tmp_path):
+    torch.manual_seed(0)
+    source, target = nn.Linear(4, 3), nn.Linear(4, 3)
+    path = str(tmp_path / "linear.flat")
+    save_flat(source.state_dict(), path)
+    for assign in (False, True):
+        load_into(target, path, assign=assign)
+        for name, tensor in source.state_dict().items():
+            assert torch.equal(target.state_dict()[name], tensor)
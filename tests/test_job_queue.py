@@ -0,0 +1,53 @@
+import pytest
+
+from job_queue import JobQueue, QueueError
+
+
+def _submit(queue, user):
+    return queue.submit(user, {}, {}, {})
+
+
+def test_per_user_and_queue_limits():
+    # Sans worker : les tâches restent en attente
+    queue = JobQueue(workers=0, max_queued=3, max_queued_per_user=2)
+    _submit(queue, "a")
+    _submit(queue, "a")
+    with pytest.raises(QueueError):
+        _submit(queue, "a")
+    _submit(queue, "b")
+    with pytest.raises(QueueError):
+        _submit(queue, "c")
+
+
+def test_users_are_served_in_turn():
+    queue = JobQueue(workers=0, max_queued_per_user=3, max_running_per_user=1)
+    a1, a2 = _submit(queue, "a"), _submit(queue, "a")
+    b1 = _submit(queue, "b")
+    assert queue.position(a2) == 2
+    with queue._condition:
+        assert queue._next_job() is a1
+        # a a déjà une tâche en cours : b passe avant la deuxième tâche de a
+        assert queue._next_job() is b1
+        assert queue._next_job() is None
+        queue._running["a"] -= 1
+        assert queue._next_job() is a2
+
+
+def test_cancel_pending_job():
+    queue = JobQueue(workers=0)
+    job = _submit(queue, "a")
+    assert not queue.cancel(job.id, "b")
+    assert queue.cancel(job.id, "a")
+    assert job.status == "annulé"
+    assert queue.position(job) == 0
+    # La place libérée compte de nouveau pour la limite par utilisateur
+    _submit(queue, "a")
+    _submit(queue, "a")
+
+
+def test_forgets_oldest_finished_jobs():
+    queue = JobQueue(workers=0, max_queued_per_user=10, max_finished=2)
+    jobs = [_submit(queue, "a") for _ in range(4)]
+    for job in jobs:
+        queue.cancel(job.id, "a")
+    assert sorted(queue.jobs) == [jobs[2].id, jobs[3].id]
@@ -0,0 +1,37 @@
+from live_chart import DecimatedSeries
+
+
+def test_keeps_every_point_below_capacity():
+    series = DecimatedSeries(max_buckets=8)
+    for i in range(5):
+        series.append(float(i), step=10 * i)
+    starts, ends, mins, maxs = series.buckets()
+    assert len(series) == 5
+    assert list(starts) == list(ends) == [0, 10, 20, 30, 40]
+    assert list(mins) == list(maxs) == [0, 1, 2, 3, 4]
+
+
+def test_merges_buckets_and_keeps_extremes():
+    series = DecimatedSeries(max_buckets=8)
+    values = [((i * 37) % 101) - 50.0 for i in range(1000)]
+    for step, value in enumerate(values):
+        series.append(value, step=step)
+    starts, ends, mins, maxs = series.buckets()
+    assert len(series) == 1000
+    assert len(mins) <= 8
+    assert series.bucket_size > 1
+    assert starts[0] == 0 and ends[-1] == 999
+    assert min(mins) == min(values) and max(maxs) == max(values)
+    # Intervalles contigus et ordonnés
+    assert all(ends[i] < starts[i + 1] for i in range(len(starts) - 1))
+
+
+def test_downsample_width():
+    series = DecimatedSeries(max_buckets=64)
+    for i in range(40):
+        series.append(float(i))
+    columns = series.downsample(10)
+    assert len(columns) == 10
+    assert columns[0] == (0, 3, 0.0, 3.0)
+    assert columns[-1] == (36, 39, 36.0, 39.0)
+    assert DecimatedSeries().downsample(10) == []
@@ -0,0 +1,57 @@
+import pytest
+import torch
+
+from model_builder import NetworkBuilder
+from pruning import prune_network, parameter_count
+
+GEN_CONFIG = {"input_size": 16, "output_size": 3, "layers": [
+    {"layer_type": "Dense", "units": 256, "activation": "relu"},
+    {"layer_type": "unflatten", "height": 4, "width": 4},
+    {"layer_type": "transposed_conv", "units": 8, "activation": "relu"},
+    {"layer_type": "transposed_conv", "units": 3, "activation": "tanh"},
+]}
+
+
+def _build():
+    torch.manual_seed(0)
+    network = NetworkBuilder.from_config(GEN_CONFIG, 100, 64).build_network()
+    # Statistiques de BatchNorm non triviales avant la comparaison en mode eval
+    network(torch.randn(8, 16))
+    return network.eval()
+
+
+def test_shapes_and_config():
+    network = _build()
+    config, pruned = prune_network(GEN_CONFIG, network, amount=0.5)
+    # Dense : groupes de 16 positions (Unflatten 4x4) retirés ensemble
+    assert [layer.get("units") for layer in config["layers"]] == [128, None, 4, 2]
+    assert GEN_CONFIG["layers"][0]["units"] == 256
+    assert parameter_count(pruned) < parameter_count(network)
+    noise = torch.randn(2, 16)
+    assert pruned(noise).shape == network(noise).shape
+    assert not pruned.training
+
+
+def test_zero_amount_is_identity():
+    network = _build()
+    config, pruned = prune_network(GEN_CONFIG, network, amount=0.0)
+    assert config == GEN_CONFIG
+    noise = torch.randn(4, 16)
+    assert torch.allclose(pruned(noise), network(noise))
+
+
+def test_removing_dead_units_keeps_output():
+    network = _build()
+    with torch.no_grad():
+        # Canaux 8 à 15 de la couche Dense éteints : l'élagage L1 les retire
+        network[0].weight[128:] = 0
+        network[0].bias[128:] = 0
+    config, pruned = prune_network(GEN_CONFIG, network, amount=0.5, layers={0: 0.5})
+    assert [layer.get("units") for layer in config["layers"]] == [128, None, 8, 3]
+    noise = torch.randn(4, 16)
+    assert torch.allclose(pruned(noise), network(noise), atol=1e-6)
+
+
+def test_unknown_criterion():
+    with pytest.raises(ValueError):
+        prune_network(GEN_CONFIG, _build(), criterion="random")
@@ -0,0 +1,51 @@
+import pytest
+import torch
+
+from replay_buffer import ReplayBuffer
+
+
+def test_ring_overwrites_oldest_samples():
+    buffer = ReplayBuffer(capacity=5, dtype="float16")
+    buffer.add(torch.arange(3.0).reshape(3, 1))
+    assert buffer.size == 3
+    buffer.add(torch.arange(3.0, 7.0).reshape(4, 1))
+    assert buffer.size == 5
+    # 0 et 1 ont été écrasés par 5 et 6, le prochain emplacement est 2
+    assert buffer.storage.flatten().tolist() == [5, 6, 2, 3, 4]
+    assert buffer._next == 2
+
+
+def test_batch_larger_than_capacity_keeps_last_samples():
+    buffer = ReplayBuffer(capacity=4)
+    buffer.add(torch.arange(10.0).reshape(10, 1))
+    assert buffer.size == 4
+    assert sorted(buffer.storage.flatten().tolist()) == [6, 7, 8, 9]
+
+
+def test_uint8_storage_round_trip():
+    buffer = ReplayBuffer(capacity=3, dtype="uint8")
+    samples = torch.tensor([[-1.0], [0.0], [1.0]])
+    buffer.add(samples)
+    assert buffer.storage.dtype == torch.uint8
+    assert torch.allclose(buffer._decode(buffer.storage), samples, atol=1 / 127.5)
+
+
+def test_fakes_skip_whole_generator_passes():
+    buffer = ReplayBuffer(capacity=64, mix=0.75)
+    calls = []
+
+    def generate(n):
+        calls.append(n)
+        return torch.rand(n, 2)
+
+    for _ in range(40):
+        assert buffer.fakes(8, generate).shape == (8, 2)
+    assert set(calls) == {8}
+    assert buffer.generator_passes == len(calls) == 10
+    assert buffer.skipped_passes == 30
+    assert buffer.hit_rate() == pytest.approx(0.75)
+
+
+def test_invalid_mix():
+    with pytest.raises(ValueError):
+        ReplayBuffer(mix=1.0)
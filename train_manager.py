@@ -4,7 +4,14 @@ import torch.optim as optim
 import torch.nn as nn
 import threading
 import time
-import matplotlib.pyplot as plt
+import contextlib
+from model_builder import get_latent_size
+from image_utils import to_uint8, make_grid, encode_png
+from sample_export import export_samples
+from profiler import LayerProfiler, export_chrome_trace, hooked_backward
+from memory_tracker import MemoryTracker
+from flat_checkpoint import save_weights, load_into
+from progressive import ProgressiveGenerator, ProgressiveDiscriminator, resolution_schedule
 
 class Trainer:
     def __init__(self, generator, discriminator, gen_train_params, disc_train_params, device=None, data_loader=None):
@@ -43,11 +50,186 @@ class Trainer:
         self.pause_event_disc.set()
         self.current_network = "générateur"
         self.epoch = 0
+        self.global_step = 0
         self.data_loader = data_loader
 
+        # Évaluation périodique (distance de Fréchet), désactivée par défaut
+        self.evaluator = None
+        self.eval_params = {}
+        self.fid_history = []
+
+        # Profilage par couche, sans hooks tant qu'il n'est pas activé
+        self.profilers = []
+
+        # Suivi mémoire par phase (désactivé par défaut)
+        self.memory = None
+
+        # Abonnés aux événements structurés (dict) de l'entraînement
+        self.listeners = []
+
+        # Aperçu périodique des échantillons (voir preview.SamplePreviewer)
+        self.previewer = None
+
+        # Tampon de faux rejoués par le discriminateur (voir replay_buffer.ReplayBuffer)
+        self.replay = None
+
+        # Contrôles au pas près (voir _control_point)
+        self._control_changed = threading.Event()
+        self._control_lock = threading.Lock()
+        self._control_requested_at = None
+        self.control_latencies = []
+        self.paused_at = None
+        # Arrêt demandé depuis un gestionnaire de signal : simple attribut, sans
+        # verrou ni Event, relu par la boucle à chaque pas (voir request_stop)
+        self.stop_requested = False
+
+        # Préemption par l'ordonnanceur : arrêt au prochain pas, poids intacts
+        self.preempt_event = threading.Event()
+        self.preempted = False
+        self.completed_epochs = 0
+        # Têtes toRGB / fromRGB et leur état Adam, conservés entre deux reprises (train_progressive)
+        self.progressive_heads = None
+
     def set_data_loader(self, data_loader):
         self.data_loader = data_loader
 
+    def set_evaluator(self, evaluator, eval_params):
+        self.evaluator = evaluator
+        self.eval_params = eval_params
+
+    def evaluate(self):
+        """Calcule la distance de Fréchet du générateur courant."""
+        fid = self.evaluator.evaluate(
+            self.generator,
+            self.data_loader.get_data_loader(),
+            dataset_key=self.data_loader.data_folder,
+            image_size=self.data_loader.image_size,
+            num_samples=self.eval_params.get("num_samples", 1000),
+            batch_size=self.eval_params.get("batch_size", 100)
+        )
+        self.fid_history.append((self.epoch, fid))
+        return fid
+
+    def _maybe_evaluate(self, epoch, msg):
+        interval = self.eval_params.get("interval", 0)
+        if self.evaluator is None or interval <= 0 or epoch % interval != 0:
+            return msg
+        fid = self.evaluate()
+        self._notify("evaluation", epoch=epoch, fid=fid)
+        return msg + f" - FID: {fid:.2f}"
+
+    def enable_profiling(self):
+        """Pose des hooks de chronométrage sur chaque couche des deux réseaux."""
+        if not self.profilers:
+            self.profilers = [
+                LayerProfiler(self.generator, "générateur"),
+                LayerProfiler(self.discriminator, "discriminateur")
+            ]
+        for profiler in self.profilers:
+            profiler.attach()
+
+    def replace_generator(self, generator, learning_rate):
+        """
+        Remplace le générateur (élagage, etc.) : nouvel optimiseur, et les
+        hooks de profilage et l'aperçu passent au nouveau réseau. L'évaluateur
+        reçoit le générateur courant à chaque évaluation.
+        """
+        was_profiling = any(profiler.attached for profiler in self.profilers)
+        self.disable_profiling()
+        self.generator = generator
+        self.gen_optimizer = optim.Adam(generator.parameters(), lr=learning_rate)
+        if self.profilers:
+            self.profilers[0] = LayerProfiler(generator, "générateur")
+        if was_profiling:
+            self.enable_profiling()
+        if self.previewer is not None:
+            self.previewer.generator = generator
+
+    def disable_profiling(self):
+        for profiler in self.profilers:
+            profiler.detach()
+
+    def profiling_report(self):
+        return "\n\n".join(profiler.summary_table() for profiler in self.profilers)
+
+    def export_profile_trace(self, path):
+        export_chrome_trace(self.profilers, path)
+
+    def _backward(self, loss):
+        if any(profiler.attached for profiler in self.profilers):
+            with hooked_backward():
+                loss.backward()
+        else:
+            loss.backward()
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def _notify(self, event_type, **fields):
+        if not self.listeners:
+            return
+        event = {"type": event_type, "time": time.time(), **fields}
+        for listener in self.listeners:
+            listener(event)
+
+    def _after_step(self, network, loss):
+        self.global_step += 1
+        self._notify("step", network=network, step=self.global_step, loss=loss)
+        if self.previewer:
+            self.previewer.maybe_capture()
+
+    def checkpoint_state(self):
+        """État complet (poids, optimiseurs, compteurs) pour reprendre l'entraînement plus tard."""
+        return {
+            "generator": self.generator.state_dict(),
+            "discriminator": self.discriminator.state_dict(),
+            "gen_optimizer": self.gen_optimizer.state_dict(),
+            "disc_optimizer": self.disc_optimizer.state_dict(),
+            "global_step": self.global_step,
+            "completed_epochs": self.completed_epochs,
+            "current_network": self.current_network,
+            "progressive_heads": self.progressive_heads
+        }
+
+    def load_checkpoint_state(self, state):
+        self.generator.load_state_dict(state["generator"])
+        self.discriminator.load_state_dict(state["discriminator"])
+        self.gen_optimizer.load_state_dict(state["gen_optimizer"])
+        self.disc_optimizer.load_state_dict(state["disc_optimizer"])
+        self.global_step = state["global_step"]
+        self.completed_epochs = state["completed_epochs"]
+        self.current_network = state["current_network"]
+        self.progressive_heads = state.get("progressive_heads")
+
+    def enable_memory_tracking(self, limit_mb=None, log_path=None, sample_interval=0.05):
+        self.memory = MemoryTracker(sample_interval, limit_mb, log_path)
+
+    def _phase(self, name):
+        return self.memory.phase(name) if self.memory else contextlib.nullcontext()
+
+    def _memory_checkpoint(self, network, epoch, callback):
+        """Rapport mémoire de fin d'epoch, transmis au callback et au journal."""
+        if self.memory is None:
+            return
+        report = self.memory.log(network=network, epoch=epoch)
+        self._notify("memory", **report)
+        if callback:
+            callback(self.memory.format_report(report))
+
+    def _memory_over_limit(self, batch_size, callback):
+        """
+        Si le plafond mémoire est dépassé, retourne une taille de batch réduite
+        de moitié, sinon None.
+        """
+        if self.memory is None or not self.memory.over_limit() or batch_size <= 1:
+            return None
+        new_size = batch_size // 2
+        self.memory.mark_reduced()
+        if callback:
+            callback(f"[Mémoire] Plafond dépassé ({self.memory.report()['total_mb']:.0f} Mo) : "
+                     f"batch réduit de {batch_size} à {new_size}")
+        return new_size
+
     def _get_loss_function(self, loss_name):
         loss_dict = {
             "MSELoss": nn.MSELoss(),
@@ -57,109 +239,357 @@ class Trainer:
         }
         return loss_dict.get(loss_name, nn.BCELoss())
     
-    def train_generator(self, epochs, batch_size, callback=None):
+    def train_generator(self, epochs, batch_size, callback=None, start_epoch=1):
         self.running_gen = True
+        self.preempted = False
+        self.completed_epochs = start_epoch - 1
         self.current_network = "générateur"
-        for epoch in range(1, epochs + 1):
-            if not self.running_gen:
-                break
-            self.pause_event_gen.wait()
+        latent_size = get_latent_size(self.generator)
+        if self.memory:
+            self.memory.start()
+        for epoch in range(start_epoch, epochs + 1):
             for i in range(3):
-                noise = torch.randn(batch_size, 98).to(self.device) #self.generator[-1].out_features
+                if not self._control_point("générateur"):
+                    break
+                noise = torch.randn(batch_size, latent_size).to(self.device)
                 
                 self._freeze(self.discriminator, True)
                 self._freeze(self.generator, False)
                 loss = self._train_generator(noise)
+                self._after_step("générateur", loss)
+                if self.preempt_event.is_set():
+                    self.preempted = True
+                    break
+                batch_size = self._memory_over_limit(batch_size, callback) or batch_size
+            if self.preempted or not self.running_gen:
+                break
+            self.epoch = epoch
+            self.completed_epochs = epoch
             msg = f"[Générateur] Epoch {epoch}/{epochs} - Loss: {loss:.4f}"
-            time.sleep(0.5)
+            self._notify("epoch", network="générateur", epoch=epoch, epochs=epochs, loss=loss)
+            msg = self._maybe_evaluate(epoch, msg)
+            # Courte pause entre epochs, interrompue par toute commande
+            self._control_changed.wait(0.5)
             if callback:
                 callback(msg)
+            self._memory_checkpoint("générateur", epoch, callback)
+        if self.memory:
+            self.memory.stop()
         self.running_gen = False
     
-    def train_discriminator(self, epochs, batch_size, callback=None):
+    def train_discriminator(self, epochs, batch_size, callback=None, start_epoch=1):
         self.running_disc = True
+        self.preempted = False
+        self.completed_epochs = start_epoch - 1
         self.current_network = "discriminateur"
+        if self.memory:
+            self.memory.start()
         data_loader = self.data_loader.get_data_loader()
-        for epoch in range(1, epochs + 1):
-            if not self.running_disc:
-                break
-            self.pause_event_disc.wait()
-            for i, (real_data, _) in enumerate(data_loader):
-                real_data = real_data.to(self.device)
-                noise = torch.randn(batch_size, 3136).to(self.device)
-                fake_data = self.generator(noise).detach()
+        loader_batch_size = self.data_loader.batch_size
+        for epoch in range(start_epoch, epochs + 1):
+            if loader_batch_size != self.data_loader.batch_size:
+                # Batch réduit par le plafond mémoire : le DataLoader suit à partir de cet epoch
+                loader_batch_size = self.data_loader.batch_size
+                data_loader = self.data_loader.get_data_loader()
+            batches = iter(data_loader)
+            # Morceaux restants du batch courant (découpé après une réduction de batch)
+            chunks = []
+            while self._control_point("discriminateur"):
+                if not chunks:
+                    with self._phase("data_fetch"):
+                        real_batch = next(batches, None)
+                    if real_batch is None:
+                        break
+                    chunks = list(real_batch[0].split(self.data_loader.batch_size))
+                real_data = chunks.pop(0).to(self.device)
+                with self._phase("g_forward"):
+                    if self.replay:
+                        fake_data = self.replay.fakes(real_data.size(0), self._generate_fakes)
+                    else:
+                        fake_data = self._generate_fakes(real_data.size(0))
                 #self.show_generated_images(fake_data)
                 
                 self._freeze(self.generator, True)
                 self._freeze(self.discriminator, False)
                 loss = self._train_discriminator(real_data, fake_data)
+                self._after_step("discriminateur", loss)
+                if self.preempt_event.is_set():
+                    self.preempted = True
+                    break
+
+                new_size = self._memory_over_limit(self.data_loader.batch_size, callback)
+                if new_size:
+                    # L'epoch continue avec le même itérateur : les batchs suivants
+                    # sont découpés à la nouvelle taille, chaque image n'est vue qu'une fois
+                    self.data_loader.batch_size = new_size
+                    chunks = [part for chunk in chunks for part in chunk.split(new_size)]
+            if self.preempted or not self.running_disc:
+                break
+            self.epoch = epoch
+            self.completed_epochs = epoch
             msg = f"[Discriminateur] Epoch {epoch}/{epochs} - Loss: {loss:.4f}"
-            time.sleep(0.5)
+            self._notify("epoch", network="discriminateur", epoch=epoch, epochs=epochs, loss=loss)
+            if self.replay:
+                stats = self.replay.stats()
+                self._notify("replay", **stats)
+                msg += (f" - Rejoués : {stats['hit_rate']:.0%} ({stats['memory_mb']:.1f} Mo, "
+                        f"{stats['skipped_passes']} passages du générateur évités)")
+            msg = self._maybe_evaluate(epoch, msg)
+            # Courte pause entre epochs, interrompue par toute commande
+            self._control_changed.wait(0.5)
             if callback:
                 callback(msg)
+            self._memory_checkpoint("discriminateur", epoch, callback)
+        if self.memory:
+            self.memory.stop()
         self.running_disc = False
 
+    def train_progressive(self, start_size=8, epochs_per_stage=2, fade_epochs=1, callback=None, start_epoch=1):
+        """
+        Entraînement à résolution croissante : les deux réseaux commencent à
+        start_size et grandissent par étapes jusqu'à la résolution du DataLoader.
+        À chaque étape, les nouveaux blocs sont introduits en fondu pendant
+        fade_epochs epochs ; chaque batch enchaîne un pas du discriminateur et
+        un pas du générateur. Les epochs sont comptés sur l'ensemble des étapes
+        (epochs_per_stage par étape), ce qui permet la reprise après préemption.
+        """
+        target_size = self.data_loader.image_size
+        latent_size = get_latent_size(self.generator)
+        generator, discriminator = self.generator, self.discriminator
+        progressive_gen = ProgressiveGenerator(generator, latent_size)
+        progressive_disc = ProgressiveDiscriminator(discriminator, target_size)
+        stages = resolution_schedule(progressive_gen, progressive_disc, start_size, target_size)
+        # Les têtes toRGB / fromRGB s'entraînent avec leur réseau
+        heads = ((self.gen_optimizer, progressive_gen.to_rgb), (self.disc_optimizer, progressive_disc.from_rgb))
+        for optimizer, module in heads:
+            optimizer.add_param_group({"params": list(module.parameters())})
+        if self.progressive_heads is not None and start_epoch > 1:
+            self._restore_heads(heads, self.progressive_heads)
+        epochs = len(stages) * epochs_per_stage
+
+        self.running_disc = True
+        self.preempted = False
+        self.completed_epochs = start_epoch - 1
+        # La boucle suit les commandes (pause, arrêt) adressées au discriminateur
+        self.current_network = "discriminateur"
+        self.generator, self.discriminator = progressive_gen, progressive_disc
+        if self.previewer:
+            # L'aperçu suit l'étape en cours (basse résolution comprise)
+            self.previewer.generator = progressive_gen
+        if self.memory:
+            self.memory.start()
+        try:
+            for epoch in range(start_epoch, epochs + 1):
+                stage_index, stage_epoch = divmod(epoch - 1, epochs_per_stage)
+                size, gen_stage, disc_entry = stages[stage_index]
+                if self.data_loader.image_size != size:
+                    self.data_loader.image_size = size
+                    data_loader = self.data_loader.get_data_loader()
+                elif epoch == start_epoch:
+                    data_loader = self.data_loader.get_data_loader()
+                fading = stage_index > 0 and stage_epoch < fade_epochs
+                num_batches = max(1, len(data_loader))
+                for index, real_data in enumerate(data_loader):
+                    if not self._control_point("discriminateur"):
+                        break
+                    alpha = (stage_epoch * num_batches + index + 1) / (fade_epochs * num_batches) if fading else 1.0
+                    progressive_gen.set_stage(gen_stage, min(alpha, 1.0))
+                    progressive_disc.set_entry(disc_entry, min(alpha, 1.0))
+
+                    real_data = real_data[0].to(self.device)
+                    with self._phase("g_forward"):
+                        noise = torch.randn(real_data.size(0), latent_size).to(self.device)
+                        fake_data = self.generator(noise).detach()
+                    self._freeze(self.generator, True)
+                    self._freeze(self.discriminator, False)
+                    disc_loss = self._train_discriminator(real_data, fake_data)
+                    self._after_step("discriminateur", disc_loss)
+
+                    self._freeze(self.discriminator, True)
+                    self._freeze(self.generator, False)
+                    gen_loss = self._train_generator(torch.randn(real_data.size(0), latent_size).to(self.device))
+                    self._after_step("générateur", gen_loss)
+                    if self.preempt_event.is_set():
+                        self.preempted = True
+                        break
+                if self.preempted or not self.running_disc:
+                    break
+                self.epoch = epoch
+                self.completed_epochs = epoch
+                msg = (f"[Progressif {size}x{size}] Epoch {epoch}/{epochs} - "
+                       f"Loss D: {disc_loss:.4f} - Loss G: {gen_loss:.4f}")
+                self._notify("epoch", network="progressif", epoch=epoch, epochs=epochs,
+                             loss=disc_loss, gen_loss=gen_loss, resolution=size)
+                msg = self._maybe_evaluate(epoch, msg)
+                self._control_changed.wait(0.5)
+                if callback:
+                    callback(msg)
+                self._memory_checkpoint("progressif", epoch, callback)
+        finally:
+            self.generator, self.discriminator = generator, discriminator
+            if self.previewer:
+                self.previewer.generator = generator
+            self.data_loader.image_size = target_size
+            # Interrompu en cours de route : les têtes sont gardées pour la reprise
+            finished = self.completed_epochs >= epochs
+            self.progressive_heads = None if finished else self._save_heads(heads)
+            # Les têtes ne servent qu'à basse résolution : les optimiseurs retrouvent
+            # leur forme d'origine (checkpoints compatibles avec un Trainer neuf)
+            for optimizer, module in heads:
+                optimizer.param_groups.pop()
+                for param in module.parameters():
+                    optimizer.state.pop(param, None)
+            if self.memory:
+                self.memory.stop()
+            self.running_disc = False
+
+    @staticmethod
+    def _save_heads(heads):
+        """Poids des têtes et état de l'optimiseur pour chacun de leurs paramètres."""
+        return [
+            {"weights": module.state_dict(),
+             "optimizer": [optimizer.state.get(param, {}) for param in module.parameters()]}
+            for optimizer, module in heads
+        ]
+
+    def _restore_heads(self, heads, saved):
+        for (optimizer, module), state in zip(heads, saved):
+            module.load_state_dict(state["weights"])
+            for param, param_state in zip(module.parameters(), state["optimizer"]):
+                if param_state:
+                    optimizer.state[param] = {
+                        key: value.to(self.device) if torch.is_tensor(value) and key != "step" else value
+                        for key, value in param_state.items()
+                    }
+
+    def _generate_fakes(self, n):
+        noise = torch.randn(n, get_latent_size(self.generator)).to(self.device)
+        with torch.no_grad():
+            return self.generator(noise)
+
     def _train_discriminator(self, real_data, fake_data):
-        self.disc_optimizer.zero_grad()
-        
-        real_labels = torch.ones(real_data.size(0), 1).to(self.device)
-        fake_labels = torch.zeros(fake_data.size(0), 1).to(self.device)
-        
-        # Calcul des pertes
-        output_real = self.discriminator(real_data)
-        loss_real = self.disc_loss_fn(output_real, real_labels)
-        output_fake = self.discriminator(fake_data)
-        loss_fake = self.disc_loss_fn(output_fake, fake_labels)
-        
-        loss = loss_real + loss_fake
-        loss.backward()
-        self.disc_optimizer.step()
+        with self._phase("d_forward_backward"):
+            self.disc_optimizer.zero_grad()
+            
+            real_labels = torch.ones(real_data.size(0), 1).to(self.device)
+            fake_labels = torch.zeros(fake_data.size(0), 1).to(self.device)
+            
+            # Calcul des pertes
+            output_real = self.discriminator(real_data)
+            loss_real = self.disc_loss_fn(output_real, real_labels)
+            output_fake = self.discriminator(fake_data)
+            loss_fake = self.disc_loss_fn(output_fake, fake_labels)
+            
+            loss = loss_real + loss_fake
+            self._backward(loss)
+        with self._phase("optimizer_step"):
+            self.disc_optimizer.step()
         return loss.item()
 
     def _train_generator(self, noise):
-        self.gen_optimizer.zero_grad()
-        
-        fake_data = self.generator(noise)
-        #.show_generated_images(fake_data)
-        fake_labels = torch.ones(fake_data.size(0), 1).to(self.device)
-        
-        # Calcul de la perte
-        output = self.discriminator(fake_data)
-        loss = self.gen_loss_fn(output, fake_labels)
+        with self._phase("g_forward"):
+            self.gen_optimizer.zero_grad()
+            
+            fake_data = self.generator(noise)
+            #.show_generated_images(fake_data)
+            fake_labels = torch.ones(fake_data.size(0), 1).to(self.device)
+
+        with self._phase("d_forward"):
+            # Calcul de la perte
+            output = self.discriminator(fake_data)
+            loss = self.gen_loss_fn(output, fake_labels)
         
-        loss.backward()
-        self.gen_optimizer.step()
+        with self._phase("g_backward"):
+            self._backward(loss)
+        with self._phase("optimizer_step"):
+            self.gen_optimizer.step()
         return loss.item()
 
     def _freeze(self, model, freeze=True):
         for param in model.parameters():
             param.requires_grad = not freeze
 
-    def pause(self):
-        self.pause_event_gen.clear()
-        self.pause_event_disc.clear()
+    @contextlib.contextmanager
+    def _control_request(self):
+        """
+        Applique une commande sous verrou : la boucle ne peut pas observer un
+        état à moitié modifié ni attribuer la latence à la mauvaise commande.
+        """
+        with self._control_lock:
+            self._control_requested_at = time.perf_counter()
+            yield
+            self._control_changed.set()
 
+    def _control_point(self, network):
+        """
+        Point de contrôle entre deux pas d'entraînement : pause, arrêt et switch
+        prennent effet ici, donc au plus un pas après la demande. En pause, la
+        boucle reste suspendue avec son état (itérateur, epoch, batch) en mémoire :
+        la reprise repart exactement du même pas, sans rien recharger.
+        Retourne False si la boucle doit s'arrêter.
+        """
+        is_gen = network == "générateur"
+        event = self.pause_event_gen if is_gen else self.pause_event_disc
+        running = self.running_gen if is_gen else self.running_disc
+        if running and event.is_set() and not self._control_changed.is_set() and not self.stop_requested:
+            return True
+        while True:
+            with self._control_lock:
+                if self.stop_requested:
+                    self.running_gen = self.running_disc = False
+                self._control_changed.clear()
+                if self._control_requested_at is not None:
+                    self.control_latencies.append(time.perf_counter() - self._control_requested_at)
+                    self._control_requested_at = None
+                running = self.running_gen if is_gen else self.running_disc
+            if not running:
+                return False
+            if event.is_set():
+                return True
+            # En pause : toute commande reçue pendant l'attente est traitée au réveil
+            self.paused_at = {"network": network, "epoch": self.epoch + 1, "step": self.global_step}
+            event.wait()
+            self.paused_at = None
+
+    def pause(self):
+        with self._control_request():
+            self.pause_event_gen.clear()
+            self.pause_event_disc.clear()
 
     def resume(self):
         self.pause_event_gen.set() if self.current_network == "générateur" else self.pause_event_disc.set()
 
+    def request_stop(self):
+        """
+        Arrêt sûr depuis un gestionnaire de signal : le signal s'exécute dans
+        le thread de la boucle, qui peut détenir _control_lock ; stop() y
+        bloquerait. La boucle s'arrête au prochain point de contrôle.
+        """
+        self.stop_requested = True
+
     def stop(self):
-        self.running_disc = False
-        self.running_gen = False
+        with self._control_request():
+            self.running_disc = False
+            self.running_gen = False
+        # Réveille une boucle en pause pour qu'elle constate l'arrêt
+        self.pause_event_gen.set()
+        self.pause_event_disc.set()
 
     def switch(self):
-        if self.current_network == "générateur":
-            self.current_network = "discriminator"
-            if self.pause_event_gen.is_set():
-                self.pause_event_gen.clear()
-                self.pause_event_disc.set()
-        else:
-            self.current_network = "générateur"
-            if self.pause_event_disc.is_set():
-                self.pause_event_disc.clear()
-                self.pause_event_gen.set()
+        with self._control_request():
+            if self.current_network == "générateur":
+                self.current_network = "discriminateur"
+                if self.pause_event_gen.is_set():
+                    self.pause_event_gen.clear()
+                    self.pause_event_disc.set()
+            else:
+                self.current_network = "générateur"
+                if self.pause_event_disc.is_set():
+                    self.pause_event_disc.clear()
+                    self.pause_event_gen.set()
     
     def plot_losses(self, gen_losses, disc_losses):
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(12, 6))
         plt.plot(gen_losses, label="Générateur")
         plt.plot(disc_losses, label="Discriminateur")
@@ -168,14 +598,16 @@ class Trainer:
         plt.show()
     
     def save_model(self, generator_path, discriminator_path):
-        torch.save(self.generator.state_dict(), generator_path)
-        torch.save(self.discriminator.state_dict(), discriminator_path)
+        # Extension .flat : checkpoint plat projeté en mémoire (voir flat_checkpoint)
+        save_weights(self.generator.state_dict(), generator_path)
+        save_weights(self.discriminator.state_dict(), discriminator_path)
 
     def load_model(self, generator_path, discriminator_path):
-        self.generator.load_state_dict(torch.load(generator_path))
-        self.discriminator.load_state_dict(torch.load(discriminator_path))
+        load_into(self.generator, generator_path, self.device)
+        load_into(self.discriminator, discriminator_path, self.device)
 
     def show_generated_images(self, images, num_images=5):
+        import matplotlib.pyplot as plt
         fig, axes = plt.subplots(1, num_images, figsize=(15, 3))
         for i in range(num_images):
             axes[i].imshow(images[i].permute(1, 2, 0).cpu().detach().numpy() * 0.5 + 0.5)
@@ -183,7 +615,18 @@ class Trainer:
         plt.show()
     
     def save_images(self, path, num_images=5):
-        noise = torch.randn(num_images, self.generator[-1].out_features).to(self.device)
-        fake_images = self.generator(noise)
-        self.show_generated_images(fake_images, num_images)
-        plt.savefig(path)
+        """Enregistre une mosaïque PNG de num_images échantillons (sans matplotlib)."""
+        was_training = self.generator.training
+        self.generator.eval()
+        try:
+            with torch.inference_mode():
+                noise = torch.randn(num_images, get_latent_size(self.generator), device=self.device)
+                fake_images = to_uint8(self.generator(noise))
+        finally:
+            self.generator.train(was_training)
+        with open(path, "wb") as f:
+            f.write(encode_png(make_grid(fake_images, nrow=num_images)))
+
+    def export_samples(self, output, num_samples, **kwargs):
+        """Export massif d'échantillons, voir sample_export.export_samples."""
+        return export_samples(self.generator, num_samples, output, device=self.device, **kwargs)